@@ -0,0 +1,80 @@
+"""Compare draw time of one scatter artist per layer with batched marker layers.
+
+Renders every action view for every player of the given matches (default: the
+heavy MD7 Benfica 4-5 Barcelona) both ways and times the draw of the finished
+figure. The per-layer path is what drawing.scatter_categories did before
+marker layers were batched. Run from the repository root:
+
+    python benchmarks/bench_draw.py ["Matches/<competition>/<match>.csv" ...]
+"""
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drawing  # noqa: E402
+import views  # noqa: E402
+from event_categories import select  # noqa: E402
+from match_store import read_match  # noqa: E402
+
+DEFAULT_MATCHES = [os.path.join("Matches", "UEFA Champions League", "MD7 - Benfica 4-5 Barcelona.csv")]
+
+# Views whose markers go through scatter_categories
+ACTION_VIEWS = ["ALL ACTIONS IN THE MATCH", "OFFENSIVE ACTIONS", "DEFENSIVE ACTIONS"]
+
+REPEATS = 3
+
+BATCHED = drawing.scatter_batched
+
+
+def scatter_layers(groups, layers, pitch, ax, styles=None):
+    """Draw each layer's events as its own scatter artist, in order, as before batching."""
+    styles = styles or {}
+    for layer in layers:
+        names = (layer,) if isinstance(layer, str) else layer
+        events = select(groups, *names)
+        pitch.scatter(events.x, events.y, ax=ax, **drawing.layer_style(names[0], styles))
+    return []
+
+
+def draw_time(df, player_name, view, batched):
+    """Best-of-REPEATS canvas draw time and artist count of one view."""
+    drawing.scatter_batched = BATCHED if batched else scatter_layers
+    best = float("inf")
+    for _ in range(REPEATS):
+        fig = views.render_view(df[df["playerName"] == player_name], player_name, view)
+        # Views draw on bare Figures, so give them an Agg canvas to draw on
+        canvas = FigureCanvasAgg(fig)
+        start = time.perf_counter()
+        canvas.draw()
+        best = min(best, time.perf_counter() - start)
+        artists = len(fig.axes[0].get_children())
+    return best, artists
+
+
+def main(*match_files):
+    for path in match_files or DEFAULT_MATCHES:
+        df = read_match(path)
+        players = sorted(df["playerName"].dropna().astype(str).unique())
+        print(os.path.basename(path))
+        for view in ACTION_VIEWS:
+            totals = {False: [0.0, 0], True: [0.0, 0]}
+            for player_name in players:
+                for batched in totals:
+                    seconds, artists = draw_time(df, player_name, view, batched)
+                    totals[batched][0] += seconds
+                    totals[batched][1] += artists
+            (old_s, old_a), (new_s, new_a) = totals[False], totals[True]
+            print(f"  {view:<26} per layer {old_s * 1000 / len(players):6.1f} ms {old_a / len(players):5.1f} artists"
+                  f"  batched {new_s * 1000 / len(players):6.1f} ms {new_a / len(players):5.1f} artists  ({old_s / new_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
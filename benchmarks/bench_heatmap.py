@@ -0,0 +1,99 @@
+"""Compare the binned heatmap with the Gaussian KDE it replaces.
+
+For every player with at least two passes, the binned density is checked
+against scipy's gaussian_kde (what seaborn evaluates) on the same grid:
+correlation of the two grids, and overlap of the shaded area above the lowest
+level. Players with fewer than HEATMAP_MIN_PASSES passes, which "binned" mode
+draws with the KDE, are reported apart. Both modes are then drawn on a pitch
+and timed. Run from the repository root, optionally on a subset of matches:
+
+    python benchmarks/bench_heatmap.py ["Matches/<competition>/<match>.csv" ...]
+"""
+import glob
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from mplsoccer import VerticalPitch  # noqa: E402
+from scipy.stats import gaussian_kde  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_categories import PASS_CATEGORIES, select, split_events  # noqa: E402
+from heatmap import HEATMAP_BINS, HEATMAP_MIN_PASSES, density_levels, draw_heatmap, pass_density  # noqa: E402
+from match_store import MATCHES_FOLDER, read_match  # noqa: E402
+
+
+def kde_density(x, y, centers):
+    grid_x, grid_y = np.meshgrid(centers, centers, indexing="ij")
+    density = gaussian_kde(np.vstack([x, y]))(np.vstack([grid_x.ravel(), grid_y.ravel()])).reshape(grid_x.shape)
+    return density / density.sum()
+
+
+def draw_time(x, y, mode):
+    pitch = VerticalPitch(pitch_type='opta', pitch_color='black', line_color='white', linewidth=3, corner_arcs=True)
+    fig, ax = pitch.draw(figsize=(10, 10))
+    start = time.perf_counter()
+    draw_heatmap(x, y, pitch, ax, mode)
+    fig.canvas.draw()
+    seconds = time.perf_counter() - start
+    plt.close(fig)
+    return seconds
+
+
+def print_parity(title, pass_counts, correlations, overlaps):
+    if not pass_counts:
+        print(f"{title}: none")
+        return
+    correlations, overlaps, pass_counts = np.array(correlations), np.array(overlaps), np.array(pass_counts)
+    print(f"{title}: {len(pass_counts)} heatmaps of {pass_counts.min()} to {pass_counts.max()} passes")
+    print(f"  grid correlation:    mean {correlations.mean():.3f}  median {np.median(correlations):.3f}  "
+          f"5th percentile {np.percentile(correlations, 5):.3f}  min {correlations.min():.3f}")
+    print(f"  shaded area overlap: mean {overlaps.mean():.3f}  median {np.median(overlaps):.3f}  min {overlaps.min():.3f}")
+    low = pass_counts[correlations < 0.9]
+    if len(low):
+        print(f"  {len(low)} with a correlation under 0.9, from {low.min()} to {low.max()} passes")
+
+
+def main(*match_files):
+    match_files = match_files or sorted(glob.glob(os.path.join(MATCHES_FOLDER, "*", "*.csv")))
+    pass_counts, correlations, overlaps = [], [], []
+    kde_time = binned_time = 0.0
+    for path in match_files:
+        df = read_match(path)
+        for player_name in df["playerName"].dropna().astype(str).unique():
+            passes = select(split_events(df[df["playerName"] == player_name]), *PASS_CATEGORIES)
+            x, y = passes.x.to_numpy(dtype=float), passes.y.to_numpy(dtype=float)
+            # gaussian_kde needs a non-singular covariance
+            if len(x) < 3 or np.linalg.matrix_rank(np.cov(x, y)) < 2:
+                continue
+
+            pass_counts.append(len(x))
+            binned, centers = pass_density(x, y, HEATMAP_BINS)
+            kde = kde_density(x, y, centers)
+            correlations.append(np.corrcoef(binned.ravel(), kde.ravel())[0, 1])
+            binned_area = binned >= density_levels(binned)[0]
+            kde_area = kde >= density_levels(kde)[0]
+            overlaps.append((binned_area & kde_area).sum() / (binned_area | kde_area).sum())
+
+            kde_time += draw_time(x, y, "kde")
+            binned_time += draw_time(x, y, "binned")
+
+    n = len(correlations)
+    print(f"{n} player heatmaps from {len(match_files)} matches")
+    binned_mode = [number for number, count in enumerate(pass_counts) if count >= HEATMAP_MIN_PASSES]
+    kde_mode = [number for number, count in enumerate(pass_counts) if count < HEATMAP_MIN_PASSES]
+    for title, numbers in [(f"binned ({HEATMAP_MIN_PASSES}+ passes)", binned_mode), (f"drawn with the KDE (under {HEATMAP_MIN_PASSES} passes)", kde_mode)]:
+        print_parity(title, [pass_counts[i] for i in numbers], [correlations[i] for i in numbers], [overlaps[i] for i in numbers])
+    print(f"KDE:    {kde_time * 1000 / n:7.1f} ms/heatmap")
+    print(f"binned: {binned_time * 1000 / n:7.1f} ms/heatmap  ({kde_time / binned_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,85 @@
+"""Compare load_match with reading whole CSVs and filtering afterwards.
+
+load_match is run twice: with CSV_CHUNK_ROWS, which holds any match of the
+corpus in one chunk, so it only reads fewer columns; and with --chunk-rows
+(default 500), which splits every match into several chunks. Each approach
+loads every match in a fresh process, so its peak RSS is not hidden by the
+others'. Both load_match frames are also checked against the full read. Run
+from the repository root:
+
+    python benchmarks/bench_ingest.py [--matches Matches] [--chunk-rows 500]
+"""
+import argparse
+import glob
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_data import CSV_CHUNK_ROWS, TEAM_NAME, compact_events, decode_qualifiers, load_match  # noqa: E402
+from match_store import MATCHES_FOLDER  # noqa: E402
+
+
+def full_load(path):
+    # What load_match did before the chunked ingest
+    df = pd.read_csv(path, low_memory=False)
+    df = df[df["teamName"] == TEAM_NAME]
+    decoded = decode_qualifiers(df)
+    return compact_events(df.assign(**{col: decoded[col] for col in decoded.columns}))
+
+
+REPEATS = 3
+
+
+def run(chunksize, files):
+    """Best-of-REPEATS seconds to load every file and the peak RSS growth in KiB, in this process.
+
+    A chunksize of None loads with full_load instead of load_match.
+    """
+    load = full_load if chunksize is None else lambda path: load_match(path, chunksize)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    seconds = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for path in files:
+            load(path)
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+
+
+def in_fresh_process(chunksize, files):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run, chunksize, files).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare load_match with the full CSV read it replaced.")
+    parser.add_argument("--matches", default=MATCHES_FOLDER, help="folder of <competition>/<match>.csv files")
+    parser.add_argument("--chunk-rows", type=int, default=500, help="rows per chunk of the split read")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.matches, "*", "*.csv")))
+    longest = max(len(pd.read_csv(path, usecols=["teamName"])) for path in files)
+    for path in files:
+        expected = full_load(path)
+        pd.testing.assert_frame_equal(load_match(path), expected, check_categorical=False)
+        pd.testing.assert_frame_equal(load_match(path, args.chunk_rows), expected, check_categorical=False)
+    print(f"{len(files)} matches of up to {longest} rows, load_match output identical to the full read")
+    if longest <= CSV_CHUNK_ROWS:
+        print(f"Every match fits in one {CSV_CHUNK_ROWS:,}-row chunk, so the app never splits a CSV")
+
+    full_time, full_rss = in_fresh_process(None, files)
+    print(f"{'full read':<28} {full_time * 1000 / len(files):6.1f} ms/match  peak RSS +{full_rss / 1024:6.1f} MiB")
+    for label, chunksize in [("needed columns, one chunk", CSV_CHUNK_ROWS), (f"chunks of {args.chunk_rows} rows", args.chunk_rows)]:
+        seconds, rss = in_fresh_process(chunksize, files)
+        print(f"{label:<28} {seconds * 1000 / len(files):6.1f} ms/match  peak RSS +{rss / 1024:6.1f} MiB  "
+              f"(vs full read {(seconds - full_time) * 1000 / len(files):+6.1f} ms/match, {(rss - full_rss) / 1024:+6.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare server time and payload of rendered images with interactive figures.
+
+For every player of the given matches (default: the heavy MD7 Benfica 4-5
+Barcelona) and every interactive view, times drawing and encoding the PNG
+the image mode sends, and building the figure the interactive mode sends.
+The figure is serialized the way st.plotly_chart does when plotly is
+installed, else with json. Switching view costs another server round trip
+in the image mode and none in the interactive mode, whose figure already
+holds every view. Run from the repository root:
+
+    python benchmarks/bench_interactive.py ["Matches/<competition>/<match>.csv" ...]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import heatmap  # noqa: E402
+from interactive import INTERACTIVE_VIEWS, interactive_figure  # noqa: E402
+from match_store import read_match  # noqa: E402
+from views import encode_figure, render_view  # noqa: E402
+
+DEFAULT_MATCHES = [os.path.join("Matches", "UEFA Champions League", "MD7 - Benfica 4-5 Barcelona.csv")]
+
+REPEATS = 3
+
+
+def serialize(figure):
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        return json.dumps(figure).encode("utf-8")
+    # st.plotly_chart validates the dict into a Figure and sends its JSON
+    return go.Figure(figure).to_json().encode("utf-8")
+
+
+def best_time(fn):
+    """Best-of-REPEATS wall time of fn and its last result."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def render_image(events, player_name, view):
+    heatmap._cached_density.cache_clear()
+    return encode_figure(render_view(events, player_name, view), "png")
+
+
+def main(*match_files):
+    for path in match_files or DEFAULT_MATCHES:
+        df = read_match(path)
+        players = sorted(df["playerName"].dropna().astype(str).unique())
+        print(os.path.basename(path))
+        for view in INTERACTIVE_VIEWS:
+            image_ms, image_kib, figure_ms, figure_kib = [], [], [], []
+            for player_name in players:
+                events = df[df["playerName"] == player_name]
+                seconds, data = best_time(lambda: render_image(events, player_name, view))
+                image_ms.append(seconds * 1000)
+                image_kib.append(len(data) / 1024)
+                seconds, data = best_time(lambda: serialize(interactive_figure(events, player_name, view)))
+                figure_ms.append(seconds * 1000)
+                figure_kib.append(len(data) / 1024)
+            print(f"  {view:<26} image {statistics.median(image_ms):7.1f} ms {statistics.median(image_kib):7.1f} KiB"
+                  f"  interactive {statistics.median(figure_ms):6.1f} ms {statistics.median(figure_kib):6.1f} KiB (all views)"
+                  f"  ({statistics.median(image_ms) / statistics.median(figure_ms):.1f}x less server time)")
+        print("  switching view: image mode renders or fetches another image; interactive mode needs no server call")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,48 @@
+"""Compare the vectorized qualifier decoder with the old row-wise df.apply loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_qualifiers.py
+"""
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_data import TEAM_NAME, decode_qualifiers  # noqa: E402
+from tests.legacy_qualifiers import legacy_end_xy, legacy_own_goal  # noqa: E402
+
+
+def main(matches_folder="Matches"):
+    files = sorted(glob.glob(os.path.join(matches_folder, "*", "*.csv")))
+    legacy_total = vectorized_total = 0.0
+
+    for path in files:
+        df = pd.read_csv(path, low_memory=False)
+        df = df[df["teamName"] == TEAM_NAME]
+
+        start = time.perf_counter()
+        expected = legacy_end_xy(df)
+        expected_own_goal = legacy_own_goal(df)
+        legacy_total += time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = decode_qualifiers(df)
+        vectorized_total += time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(decoded[['end_x', 'end_y']], expected)
+        pd.testing.assert_series_equal(decoded['own_goal'], expected_own_goal.astype(bool), check_names=False)
+
+    print(f"{len(files)} matches, outputs identical")
+    print(f"row-wise apply: {legacy_total:8.3f} s")
+    print(f"vectorized:     {vectorized_total:8.3f} s")
+    if vectorized_total:
+        print(f"speedup:        {legacy_total / vectorized_total:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
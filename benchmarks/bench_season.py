@@ -0,0 +1,49 @@
+"""Time loading and drawing a season aggregate of one competition.
+
+Loads every match of the competition with load_season, serially and with the
+thread pool, then renders each view for the player with the most events.
+Build the store first for representative load times. Run from the
+repository root:
+
+    python benchmarks/bench_season.py ["La Liga"]
+"""
+import glob
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_store import MATCHES_FOLDER  # noqa: E402
+from season import load_season, season_player_events  # noqa: E402
+from views import VIEWS, encode_figure, render_view  # noqa: E402
+
+
+def main(competition="La Liga"):
+    match_files = sorted(glob.glob(os.path.join(MATCHES_FOLDER, competition, "*.csv")))
+
+    start = time.perf_counter()
+    load_season(match_files, workers=1)
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    season = load_season(match_files)
+    parallel = time.perf_counter() - start
+    print(f"{competition}: {len(match_files)} matches, {len(season)} events")
+    print(f"load: {serial:.2f} s serial, {parallel:.2f} s with threads")
+
+    player_name = season.index.value_counts().idxmax()
+    start = time.perf_counter()
+    events = season_player_events(season, player_name)
+    print(f"slice {player_name}: {len(events)} events in {(time.perf_counter() - start) * 1000:.2f} ms")
+    for view in VIEWS:
+        start = time.perf_counter()
+        data = encode_figure(render_view(events, player_name, view))
+        print(f"  {view:<26} {time.perf_counter() - start:.2f} s  {len(data) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,55 @@
+"""Compare loading a match from its CSV with loading it from the columnar store.
+
+Build the store first, then run from the repository root:
+
+    python match_store.py
+    python benchmarks/bench_store.py
+"""
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_data import TEAM_NAME, decode_qualifiers  # noqa: E402
+from match_store import MATCHES_FOLDER, is_stale, read_match, store_path  # noqa: E402
+
+
+def csv_load(path):
+    # What the app did per selection before the store existed
+    df = pd.read_csv(path, low_memory=False)
+    df = df[df["teamName"] == TEAM_NAME]
+    decoded = decode_qualifiers(df)
+    return df.assign(**{col: decoded[col] for col in decoded.columns})
+
+
+def main(matches_folder=MATCHES_FOLDER):
+    files = sorted(glob.glob(os.path.join(matches_folder, "*", "*.csv")))
+    stale = [path for path in files if is_stale(path, store_path(path, matches_folder))]
+    if stale:
+        print(f"{len(stale)} matches have no up to date converted copy, run match_store.py first")
+        return
+
+    csv_time = store_time = 0.0
+    csv_bytes = store_bytes = 0
+    for path in files:
+        start = time.perf_counter()
+        df = csv_load(path)
+        csv_time += time.perf_counter() - start
+        csv_bytes += df.memory_usage(deep=True).sum()
+
+        start = time.perf_counter()
+        df = read_match(path, matches_folder)
+        store_time += time.perf_counter() - start
+        store_bytes += df.memory_usage(deep=True).sum()
+
+    print(f"{len(files)} matches")
+    print(f"CSV:   {csv_time * 1000 / len(files):7.1f} ms/match  {csv_bytes / len(files) / 1024:8.1f} KiB/match")
+    print(f"store: {store_time * 1000 / len(files):7.1f} ms/match  {store_bytes / len(files) / 1024:8.1f} KiB/match")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
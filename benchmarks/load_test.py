@@ -0,0 +1,145 @@
+"""Simulate concurrent app sessions rendering views through the render pool.
+
+Each of --sessions threads plays one user: it picks a random match, player
+and view, asks for its image the way render_cache does, then thinks for
+--think seconds before the next request. By default every request is drawn,
+the worst case of a cold cache; --cached serves repeats from a byte-budgeted
+render cache as the app does. The run reports throughput, latency
+percentiles, requests refused by the full queue, and the resident memory of
+this process (plus the workers of a process pool) sampled over time. Run
+from the repository root:
+
+    python benchmarks/load_test.py [--sessions 8] [--duration 60] [--pool thread|process] ["Matches/<competition>/<match>.csv" ...]
+"""
+import argparse
+import glob
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_store import MATCHES_FOLDER, read_match  # noqa: E402
+from render_pool import RENDER_QUEUE, RENDER_WAIT, RENDER_WORKERS, RenderBusy, RenderPool  # noqa: E402
+from views import VIEWS, render_image  # noqa: E402
+
+
+def rss_mib(pid):
+    """Resident memory of a process from /proc, or this process's peak where /proc is missing."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    if pid != os.getpid():
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def load_players(match_files):
+    """(match path, player, events) for every player of the matches, sliced once as the app's cache does."""
+    targets = []
+    for path in match_files:
+        df = read_match(path)
+        for player_name in sorted(df["playerName"].dropna().astype(str).unique()):
+            targets.append((path, player_name, df[df["playerName"] == player_name]))
+    return targets
+
+
+def run_session(number, pool, targets, deadline, think, cache, results, lock):
+    rng = random.Random(number)
+    while time.monotonic() < deadline:
+        path, player_name, events = rng.choice(targets)
+        view = rng.choice(VIEWS)
+        key = (path, player_name, view, "png")
+        start = time.perf_counter()
+        try:
+            if cache is None or cache.get(key) is None:
+                data = pool.render(key, render_image, events, player_name, view, "png")
+                if cache is not None:
+                    cache.put(key, data)
+            outcome = "ok"
+        except RenderBusy:
+            outcome = "rejected"
+        latency = time.perf_counter() - start
+        with lock:
+            results.append((time.monotonic(), outcome, latency))
+        time.sleep(rng.uniform(0, 2 * think))
+
+
+def sample_memory(pool, deadline, interval, samples, results, lock, started):
+    while True:
+        with lock:
+            done = sum(1 for _, outcome, _ in results if outcome == "ok")
+        memory = rss_mib(os.getpid()) + sum(rss_mib(pid) for pid in pool.worker_pids())
+        samples.append((time.monotonic() - started, memory, done, pool.stats()["in flight"]))
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test view rendering with concurrent simulated sessions.")
+    parser.add_argument("matches", nargs="*", help="match CSVs to draw from (default: the largest match of each competition)")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--think", type=float, default=0.5, help="mean seconds a user waits between requests")
+    parser.add_argument("--cached", action="store_true", help="serve repeat requests from a render cache, as the app does")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread", help="kind of render workers")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS, help="renders drawn at once")
+    parser.add_argument("--queue", type=int, default=RENDER_QUEUE, help="renders waiting for a worker")
+    parser.add_argument("--wait", type=float, default=RENDER_WAIT, help="seconds to wait for a queue slot")
+    parser.add_argument("--sample", type=float, default=5, help="seconds between memory samples")
+    args = parser.parse_args()
+
+    match_files = args.matches or [max(glob.glob(os.path.join(MATCHES_FOLDER, competition, "*.csv")), key=os.path.getsize)
+                                   for competition in sorted(os.listdir(MATCHES_FOLDER))]
+    targets = load_players(match_files)
+    pool = RenderPool(args.workers, args.queue, args.wait, args.pool)
+    cache = None
+    if args.cached:
+        from render_cache import RENDER_CACHE_BYTES, ByteLRUCache
+
+        cache = ByteLRUCache(RENDER_CACHE_BYTES)
+    print(f"{args.sessions} sessions over {len(targets)} players of {len(match_files)} matches for {args.duration:.0f} s "
+          f"({args.pool} pool, {args.workers} workers, queue {args.queue}{', cached' if cache else ''})")
+
+    results, samples, lock = [], [], threading.Lock()
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=run_session, args=(number, pool, targets, deadline, args.think, cache, results, lock))
+               for number in range(args.sessions)]
+    threads.append(threading.Thread(target=sample_memory, args=(pool, deadline, args.sample, samples, results, lock, started)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies = np.array([latency for _, outcome, latency in results if outcome == "ok"]) * 1000
+    rejected = sum(1 for _, outcome, _ in results if outcome == "rejected")
+    print(f"\n{len(latencies)} requests served, {rejected} refused, {len(latencies) / elapsed:.2f} requests/s")
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"latency ms: p50 {p50:.0f}  p95 {p95:.0f}  p99 {p99:.0f}  max {latencies.max():.0f}")
+    print(f"pool: {pool.stats()}")
+
+    print(f"\n{'seconds':>8} {'RSS MiB':>9} {'served':>7} {'in flight':>10}")
+    for seconds, memory, done, in_flight in samples:
+        print(f"{seconds:8.0f} {memory:9.1f} {done:7d} {in_flight:10d}")
+    if len(samples) > 1:
+        growth = samples[-1][1] - samples[0][1]
+        print(f"memory growth: {growth:+.1f} MiB ({growth / (samples[-1][0] - samples[0][0]) * 60:+.1f} MiB/min)")
+
+
+if __name__ == "__main__":
+    main()
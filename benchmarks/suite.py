@@ -0,0 +1,197 @@
+"""Headless benchmark suite over the bundled Matches/ corpus.
+
+For the largest matches of every competition it times, outside Streamlit:
+
+    csv load          match_data.load_match (parse, team filter, decode, compact)
+    qualifier decode  match_data.decode_qualifiers on the already parsed rows
+    store read        match_store.read_match from the columnar store, if built
+    player slice      one boolean-mask slice per player of the match
+    view: <VIEW>      drawing and encoding each view for the busiest player
+    team: <VIEW>      pass network, then drawing and encoding each team view
+
+Each stage is timed over --repeats runs (median kept), then run once more
+under tracemalloc for its peak memory. Totals per stage are compared with a
+stored baseline and the run fails when a stage is slower than the baseline by
+more than --tolerance. Run from the repository root:
+
+    python benchmarks/suite.py [--per-competition 2 | --all] [--save-baseline]
+
+The baseline is per machine: timings depend on the CPU and the library
+versions, so benchmarks/baseline.json is not committed. It is only written
+by --save-baseline, on a first run or after an intended change; without one
+the run fails rather than passing unchecked. A CI job can keep its baseline
+outside the checkout and pass it with --baseline. The baseline keeps the
+machine and versions it was recorded with, and a run on a different
+environment warns that the comparison is not meaningful.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import heatmap  # noqa: E402
+from match_data import TEAM_NAME, decode_qualifiers, load_match  # noqa: E402
+from match_store import MATCHES_FOLDER, is_stale, read_match, store_path  # noqa: E402
+from team_views import pass_network  # noqa: E402
+from views import TEAM_VIEWS, VIEWS, encode_figure, render_team_view, render_view  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def pick_matches(matches_folder, per_competition):
+    """The largest CSVs of every competition, or all of them when per_competition is None."""
+    picked = []
+    for competition in sorted(os.listdir(matches_folder)):
+        files = sorted(glob.glob(os.path.join(matches_folder, competition, "*.csv")), key=os.path.getsize, reverse=True)
+        picked += files if per_competition is None else files[:per_competition]
+    return picked
+
+
+def measure(fn, repeats):
+    """Median wall time of fn over repeats, then its peak traced memory in one more run."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def render_cold(events, player_name, view):
+    # Every repeat should pay for the heatmap, as a first render does
+    heatmap._cached_density.cache_clear()
+    return encode_figure(render_view(events, player_name, view))
+
+
+def render_team_cold(events, view):
+    return encode_figure(render_team_view(events, pass_network(events), view))
+
+
+def match_stages(path, matches_folder):
+    """(stage, callable) pairs to benchmark for one match."""
+    raw = pd.read_csv(path, low_memory=False)
+    team_rows = raw[raw["teamName"] == TEAM_NAME]
+    df = load_match(path)
+    players = df["playerName"].dropna().astype(str).unique()
+    busiest = df["playerName"].value_counts().idxmax()
+    player_events = df[df["playerName"] == busiest]
+
+    def slice_players():
+        for player_name in players:
+            df[df["playerName"] == player_name]
+
+    stages = [
+        ("csv load", lambda: load_match(path)),
+        ("qualifier decode", lambda: decode_qualifiers(team_rows)),
+    ]
+    if not is_stale(path, store_path(path, matches_folder)):
+        stages.append(("store read", lambda: read_match(path, matches_folder)))
+    stages.append(("player slice", slice_players))
+    for view in VIEWS:
+        stages.append((f"view: {view}", lambda view=view: render_cold(player_events, busiest, view)))
+    for view in TEAM_VIEWS:
+        stages.append((f"team: {view}", lambda view=view: render_team_cold(df, view)))
+    return stages
+
+
+def run_suite(match_files, matches_folder, repeats):
+    results = {"matches": {}, "stages": {}}
+    for path in match_files:
+        name = os.path.relpath(path, matches_folder)
+        results["matches"][name] = {}
+        for stage_name, fn in match_stages(path, matches_folder):
+            seconds, peak = measure(fn, repeats)
+            results["matches"][name][stage_name] = {"seconds": seconds, "peak_mib": peak / 2**20}
+            total = results["stages"].setdefault(stage_name, {"seconds": 0.0, "peak_mib": 0.0, "matches": 0})
+            total["seconds"] += seconds
+            total["peak_mib"] = max(total["peak_mib"], peak / 2**20)
+            total["matches"] += 1
+        print(f"  {name}", flush=True)
+    results["environment"] = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each stage against the baseline; returns the stages that regressed."""
+    regressions = []
+    print(f"{'stage':<34} {'seconds':>9} {'baseline':>9} {'ratio':>6} {'peak MiB':>9}")
+    for stage_name, total in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage_name)
+        if base is None or base["matches"] != total["matches"]:
+            print(f"{stage_name:<34} {total['seconds']:9.3f} {'-':>9} {'-':>6} {total['peak_mib']:9.1f}")
+            continue
+        ratio = total["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{stage_name:<34} {total['seconds']:9.3f} {base['seconds']:9.3f} {ratio:6.2f} {total['peak_mib']:9.1f}{flag}")
+        if flag:
+            regressions.append(stage_name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load, decode, slicing and every view over the Matches/ corpus.")
+    parser.add_argument("--matches", default=MATCHES_FOLDER, help="folder of <competition>/<match>.csv files")
+    parser.add_argument("--per-competition", type=int, default=2, help="largest matches taken from each competition")
+    parser.add_argument("--all", action="store_true", help="benchmark every match instead")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per stage; the median is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per stage, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline instead of comparing with it")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} to compare with; record one with --save-baseline")
+        sys.exit(2)
+
+    match_files = pick_matches(args.matches, None if args.all else args.per_competition)
+    print(f"Benchmarking {len(match_files)} matches")
+    results = run_suite(match_files, args.matches, args.repeats)
+    results["settings"] = {"per_competition": None if args.all else args.per_competition, "repeats": args.repeats}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"Saved baseline for this machine to {args.baseline}; later runs are compared with it")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != results["environment"]:
+        print(f"Baseline recorded on {baseline.get('environment')}, this run on {results['environment']}; "
+              "timings may differ for that reason alone, run with --save-baseline to re-record it")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} stages slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
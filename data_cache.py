@@ -0,0 +1,182 @@
+"""Memoized match and player loaders shared by every session of the app.
+
+Entries are keyed by file path and modification time, so a replaced CSV or
+rebuilt store file is picked up on the next rerun. The match catalog is kept
+by one match_watcher.MatchWatcher per process, which poll_matches updates for
+the CSVs that changed only. Bounds come from the environment:
+
+    BARCA_MATCH_CACHE_ENTRIES   matches kept in memory (default 64)
+    BARCA_PLAYER_CACHE_ENTRIES  player slices kept in memory (default 256)
+    BARCA_SEASON_CACHE_ENTRIES  season selections kept in memory (default 8)
+    BARCA_CACHE_TTL             seconds before an entry expires (default 3600)
+"""
+import os
+import threading
+
+import streamlit as st
+
+from match_store import INDEX_NAME, MATCHES_FOLDER, STORE_FOLDER, PlayerIndex, read_match
+from match_watcher import MatchWatcher
+from profiling import stage
+from season import load_season
+from team_views import pass_network
+
+MATCH_CACHE_ENTRIES = int(os.environ.get("BARCA_MATCH_CACHE_ENTRIES", 64))
+PLAYER_CACHE_ENTRIES = int(os.environ.get("BARCA_PLAYER_CACHE_ENTRIES", 256))
+SEASON_CACHE_ENTRIES = int(os.environ.get("BARCA_SEASON_CACHE_ENTRIES", 8))
+CACHE_TTL = int(os.environ.get("BARCA_CACHE_TTL", 3600))
+
+# Per-cache call and miss counts; the cached bodies only run on a miss
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(cache_name, field):
+    with _stats_lock:
+        counts = _stats.setdefault(cache_name, {"calls": 0, "misses": 0})
+        counts[field] += 1
+
+
+def cache_stats():
+    """One row per cache with its calls, hits and misses since startup."""
+    with _stats_lock:
+        return [
+            {"cache": name, "calls": counts["calls"], "hits": counts["calls"] - counts["misses"], "misses": counts["misses"]}
+            for name, counts in sorted(_stats.items())
+        ]
+
+
+@st.cache_data(max_entries=MATCH_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _match_events(match_file_path, mtime):
+    _count("match", "misses")
+    return read_match(match_file_path)
+
+
+@st.cache_data(max_entries=PLAYER_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _player_events(match_file_path, mtime, player_name):
+    _count("player", "misses")
+    df = get_match_events(match_file_path, mtime)
+    index = get_player_index()
+    with stage("player slice") as counters:
+        if index is not None and index.covers(match_file_path):
+            rows = index.player_rows(match_file_path, player_name)
+            events = df.iloc[rows] if rows is not None else df.iloc[:0]
+        else:
+            events = df[df["playerName"] == player_name]
+        counters["rows"] = len(events)
+    return events
+
+
+@st.cache_data(max_entries=MATCH_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _team_network(match_file_path, mtime):
+    _count("team", "misses")
+    return pass_network(get_match_events(match_file_path, mtime))
+
+
+# Only the current index is useful; a rebuilt one replaces it
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _player_index(store_folder, mtime):
+    _count("index", "misses")
+    return PlayerIndex.load(store_folder=store_folder)
+
+
+def get_match_events(match_file_path, mtime=None):
+    """Barcelona's events for a match, loaded once per file version."""
+    _count("match", "calls")
+    if mtime is None:
+        mtime = os.path.getmtime(match_file_path)
+    return _match_events(match_file_path, mtime)
+
+
+def get_player_events(match_file_path, player_name):
+    """One player's events for a match, sliced once per file version."""
+    _count("player", "calls")
+    return _player_events(match_file_path, os.path.getmtime(match_file_path), player_name)
+
+
+def get_player_type_runs(match_file_path, player_name):
+    """The index's typeId runs of a player's events in a match, or None when it does not cover the match."""
+    index = get_player_index()
+    if index is None or not index.covers(match_file_path):
+        return None
+    return index.type_runs(match_file_path, player_name)
+
+
+def get_team_network(match_file_path, mtime=None):
+    """(nodes, edges) of a match's pass network, computed once per file version."""
+    _count("team", "calls")
+    if mtime is None:
+        mtime = os.path.getmtime(match_file_path)
+    return _team_network(match_file_path, mtime)
+
+
+@st.cache_data(max_entries=SEASON_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _season_events(versions):
+    _count("season", "misses")
+    with stage("season load") as counters:
+        season = load_season([path for path, _ in versions])
+        counters["rows"] = len(season)
+    return season
+
+
+@st.cache_resource(show_spinner=False)
+def _match_watcher(matches_folder):
+    return MatchWatcher(matches_folder)
+
+
+def file_versions(match_files):
+    """(path, mtime) of each file, the cache key of a set of matches."""
+    return tuple((path, os.path.getmtime(path)) for path in match_files)
+
+
+def get_season_events(match_files):
+    """Events of several matches in one player-indexed frame, loaded once per set of file versions."""
+    _count("season", "calls")
+    return _season_events(file_versions(match_files))
+
+
+def poll_matches(matches_folder=MATCHES_FOLDER):
+    """Bring the catalog, store and index up to date with the match CSVs.
+
+    Returns the added, changed and removed paths, or None when nothing changed
+    or the last scan was too recent. Cached data of other matches is kept;
+    entries of changed files are keyed by their old mtime and never hit again.
+    """
+    with stage("match scan") as counters:
+        changes = _match_watcher(matches_folder).poll()
+        counters["changed"] = sum(len(paths) for paths in changes.values()) if changes else 0
+    return changes
+
+
+def get_match_catalog(matches_folder=MATCHES_FOLDER):
+    """Every match with its competition and date, oldest first, as of the last scan."""
+    return _match_watcher(matches_folder).match_catalog()
+
+
+def get_competition_catalog(matches_folder=MATCHES_FOLDER):
+    """Match names per competition, newest first, as of the last scan."""
+    return _match_watcher(matches_folder).competition_catalog()
+
+
+def get_match_errors(matches_folder=MATCHES_FOLDER):
+    """Error of every match file the last scans could not read, keyed by path."""
+    return _match_watcher(matches_folder).errors
+
+
+def get_player_index(store_folder=STORE_FOLDER):
+    """The store's player index, reloaded when it is rebuilt; None without one."""
+    _count("index", "calls")
+    try:
+        mtime = os.path.getmtime(os.path.join(store_folder, INDEX_NAME))
+    except FileNotFoundError:
+        return None
+    return _player_index(store_folder, mtime)
+
+
+def get_match_players(match_file_path):
+    """Sorted names of the players of a match, from the index when it covers the match."""
+    index = get_player_index()
+    if index is not None and index.covers(match_file_path):
+        return index.players(match_file_path)
+    df = get_match_events(match_file_path)
+    return sorted(df["playerName"].dropna().astype(str).unique())
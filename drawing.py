@@ -0,0 +1,305 @@
+"""Matplotlib drawing of the views; imported by views.render_view on first use.
+
+Figures are plain matplotlib.figure.Figure objects drawn through their own
+axes, never through pyplot, so renders on different threads or processes
+share no figure state and a figure is freed once the caller drops it.
+"""
+import matplotlib
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.markers import MarkerStyle
+from mplsoccer import VerticalPitch
+from scipy.spatial import ConvexHull
+
+from event_categories import ASSIST_CATEGORIES, CATEGORY_STYLES, GOALKEEPERS, INCOMPLETE_PASS_CATEGORIES, KEY_PASS_CATEGORIES, NON_PITCH_TYPES, PASS_CATEGORIES, SHOT_LAYERS, select, split_events, view_markers
+from heatmap import draw_heatmap
+from profiling import stage
+
+
+def scatter_batched(groups, layers, pitch, ax, styles=None):
+    """Draw layers sharing a marker as one scatter with per-point sizes and colours.
+
+    A layer is a category name, or a tuple of names drawn with the first one's
+    style. ``styles`` overrides the style of individual categories. The merged
+    collections carry no label, so the legend entries are returned as proxy
+    handles, in layer order.
+    """
+    styles = styles or {}
+    batches = {}
+    handles = []
+    for layer in layers:
+        names = (layer,) if isinstance(layer, str) else layer
+        events = select(groups, *names)
+        style = layer_style(names[0], styles)
+        marker = style.get("marker", "o")
+        if marker == "football":
+            # mplsoccer draws the ball as two artists of its own
+            pitch.scatter(events.x, events.y, ax=ax, **style)
+            continue
+
+        batch = batches.setdefault(marker, {"x": [], "y": [], "s": [], "c": [], "edgecolors": []})
+        batch["x"].append(events.x.to_numpy(dtype=float))
+        batch["y"].append(events.y.to_numpy(dtype=float))
+        batch["s"].append(np.full(len(events), style["s"], dtype=float))
+        batch["c"] += [style["c"]] * len(events)
+        batch["edgecolors"] += [style.get("edgecolor", style.get("edgecolors"))] * len(events)
+        handles.append(legend_proxy(style))
+
+    for marker, batch in batches.items():
+        x = np.concatenate(batch["x"])
+        if len(x):
+            # Unfilled markers take their colour from c, as plt.scatter does
+            edgecolors = batch["edgecolors"] if MarkerStyle(marker).is_filled() else None
+            pitch.scatter(x, np.concatenate(batch["y"]), s=np.concatenate(batch["s"]), c=batch["c"], edgecolors=edgecolors, marker=marker, ax=ax)
+    return handles
+
+
+def layer_style(name, styles):
+    return {**CATEGORY_STYLES[name], **styles.get(name, {})}
+
+
+def legend_proxy(style):
+    """Legend handle looking like a scatter drawn with ``style``."""
+    marker = style.get("marker", "o")
+    edgecolor = style.get("edgecolor", style.get("edgecolors"))
+    if not MarkerStyle(marker).is_filled():
+        edgecolor = style["c"]
+    return Line2D([], [], linestyle="None", marker=marker, markersize=np.sqrt(style["s"]), markerfacecolor=style["c"],
+                  markeredgecolor=edgecolor, markeredgewidth=matplotlib.rcParams["lines.linewidth"], label=style["label"])
+
+
+def scatter_categories(groups, layers, pitch, ax, styles=None):
+    """Draw marker layers and return the legend handles they did not label themselves."""
+    with stage("markers") as counters:
+        artists = len(ax.get_children())
+        handles = scatter_batched(groups, layers, pitch, ax, styles)
+        counters["artists"] = len(ax.get_children()) - artists
+    return handles
+
+
+def draw_legend(ax, handles, **kwargs):
+    """Legend of the labelled artists on ax followed by ``handles``."""
+    ax_handles, ax_labels = ax.get_legend_handles_labels()
+    ax.legend(ax_handles + handles, ax_labels + [handle.get_label() for handle in handles], **kwargs)
+
+
+def draw_endnote(ax):
+    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
+    ax.figure.text(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
+
+
+def draw_shots(groups, pitch, ax):
+    scatter_categories(groups, SHOT_LAYERS, pitch, ax)
+
+
+def draw_chances(groups, pitch, ax):
+    assist = select(groups, *ASSIST_CATEGORIES)
+    chance = select(groups, *KEY_PASS_CATEGORIES)
+
+    pitch.lines(assist.x, assist.y, assist.end_x, assist.end_y, color='#00ff00', comet = True, lw = 2.5, ax=ax, label='Assist')
+    ax.scatter(assist['end_y'], assist['end_x'], s=50, c='black', edgecolor='#00ff00')
+
+    pitch.lines(chance.x, chance.y, chance.end_x, chance.end_y, color='#ffea00', comet = True, lw = 2.5, ax=ax, label='Key Pass')
+    ax.scatter(chance['end_y'], chance['end_x'], s=50, c='black', edgecolor='#ffea00')
+
+
+def draw_pass_heatmap(groups, pitch, ax):
+    passes = select(groups, *PASS_CATEGORIES)
+    with stage("heatmap") as counters:
+        draw_heatmap(passes.x, passes.y, pitch, ax)
+        counters["rows"] = len(passes)
+
+
+def draw_pass_arrows(passes_successful, passes_unsuccessful, selected_player, pitch, ax):
+    with stage("pass arrows") as counters:
+        _draw_pass_arrows(passes_successful, passes_unsuccessful, selected_player, pitch, ax)
+        counters["rows"] = len(passes_successful) + len(passes_unsuccessful)
+
+
+def _draw_pass_arrows(passes_successful, passes_unsuccessful, selected_player, pitch, ax):
+    if selected_player in GOALKEEPERS:
+        pitch.arrows(passes_successful.x, passes_successful.y, passes_successful.end_x, passes_successful.end_y, width=0.75, color='#00ff00', ax=ax, label='Completed Pass')
+        pitch.arrows(passes_unsuccessful.x, passes_unsuccessful.y, passes_unsuccessful.end_x, passes_unsuccessful.end_y, width=0.75, color='red', ax=ax, label='Incomplete Pass')
+    else:
+        pitch.arrows(passes_successful.x, passes_successful.y, passes_successful.end_x, passes_successful.end_y, width=0.6, headwidth=5, headlength=5, color='#00ff00', ax=ax, label='Completed Pass')
+        pitch.arrows(passes_unsuccessful.x, passes_unsuccessful.y, passes_unsuccessful.end_x, passes_unsuccessful.end_y, width=0.6, headwidth=5, headlength=5, color='red', ax=ax, label='Incomplete Pass')
+
+
+def draw_all_actions(filtered_data, selected_player, pitch, ax, type_runs=None):
+    groups = split_events(filtered_data, type_runs)
+    draw_pass_heatmap(groups, pitch, ax)
+    layers, styles = view_markers('ALL ACTIONS IN THE MATCH', selected_player)
+
+    if selected_player in GOALKEEPERS:
+        draw_pass_arrows(select(groups, 'pass_complete', 'assist'), select(groups, *INCOMPLETE_PASS_CATEGORIES), selected_player, pitch, ax)
+        handles = scatter_categories(groups, layers, pitch, ax, styles)
+
+        draw_legend(ax, handles, loc='upper left', bbox_to_anchor=(-0.19, 1.12), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
+
+    else:
+        draw_shots(groups, pitch, ax)
+        draw_chances(groups, pitch, ax)
+        # Key passes are drawn as chances, not as completed passes
+        draw_pass_arrows(select(groups, 'pass_complete', 'assist'), select(groups, *INCOMPLETE_PASS_CATEGORIES), selected_player, pitch, ax)
+        handles = scatter_categories(groups, layers, pitch, ax, styles)
+
+        draw_legend(ax, handles, loc='upper left', bbox_to_anchor=(-0.23, 1.17), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
+
+    draw_endnote(ax)
+
+
+def draw_passes_and_heatmap(filtered_data, selected_player, pitch, ax, type_runs=None):
+    groups = split_events(filtered_data, type_runs)
+    draw_pass_heatmap(groups, pitch, ax)
+    draw_pass_arrows(select(groups, 'pass_complete', 'assist', 'key_pass'), select(groups, *INCOMPLETE_PASS_CATEGORIES), selected_player, pitch, ax)
+    draw_chances(groups, pitch, ax)
+
+    ax.legend(loc='upper left', bbox_to_anchor=(0.205, 1.06), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=2, edgecolor='#ffffff')
+    draw_endnote(ax)
+
+
+def draw_offensive_actions(filtered_data, selected_player, pitch, ax, type_runs=None):
+    groups = split_events(filtered_data, type_runs)
+    draw_pass_heatmap(groups, pitch, ax)
+    draw_shots(groups, pitch, ax)
+    draw_chances(groups, pitch, ax)
+    layers, styles = view_markers('OFFENSIVE ACTIONS', selected_player)
+    handles = scatter_categories(groups, layers, pitch, ax, styles)
+
+    draw_legend(ax, handles, loc='upper left', bbox_to_anchor=(-0.2, 1.09), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
+    draw_endnote(ax)
+
+
+def draw_defensive_actions(filtered_data, selected_player, pitch, ax, type_runs=None):
+    groups = split_events(filtered_data, type_runs)
+    draw_pass_heatmap(groups, pitch, ax)
+    layers, styles = view_markers('DEFENSIVE ACTIONS', selected_player)
+
+    if selected_player in GOALKEEPERS:
+        handles = scatter_categories(groups, layers, pitch, ax, styles)
+
+        draw_legend(ax, handles, loc='upper left', bbox_to_anchor=(-0.13, 1.09), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
+
+    else:
+        handles = scatter_categories(groups, layers, pitch, ax, styles)
+
+        draw_legend(ax, handles, loc='upper left', bbox_to_anchor=(-0.17, 1.12), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
+
+    draw_endnote(ax)
+
+
+def has_area(x, y):
+    """True when the points span an area, which ConvexHull needs: three or more, not all on one line."""
+    points = np.unique(np.column_stack((x, y)), axis=0)
+    return len(points) >= 3 and np.linalg.matrix_rank(points[1:] - points[0]) == 2
+
+
+def draw_convex_hull(filtered_data, selected_player, pitch, ax, type_runs=None):
+    # Every on-pitch event is drawn alike, so the typeId runs are not needed
+    # Filter data and scatter plot
+    filtered = filtered_data[~filtered_data['typeId'].isin(NON_PITCH_TYPES)]
+    pitch.scatter(filtered.x, filtered.y, color='#00FF00', s=80, edgecolors='#FFFFFF', linewidth=1, ax=ax)
+
+    pitch.scatter(filtered.x, filtered.y, color='#00FF00', s=80, edgecolors='#FFFFFF', linewidth=1, ax=ax)
+
+    # Players with fewer than three distinct, non-collinear touches only get their dots
+    if has_area(filtered.x, filtered.y):
+        # Creating an array of (x, y) coordinates for convex hull calculation
+        points = np.column_stack((filtered.x, filtered.y))
+
+        # Calculate the convex hull of the data points
+        hull1 = pitch.convexhull(filtered.x, filtered.y)
+        hull = ConvexHull(points)
+
+        # Plot the edges of the convex hull
+        for simplex in hull.simplices:
+            pitch.plot(filtered.x.iloc[simplex], filtered.y.iloc[simplex], color='#00FFFF', linewidth=3, linestyle='dashed', ax=ax)
+
+        # Create a polygon from the convex hull with a semi-transparent fill
+        pitch.polygon(hull1, color='#00FFFF', alpha=0.2, ax=ax)
+
+    draw_endnote(ax)
+
+
+def draw_pass_network(team_data, network, pitch, ax):
+    nodes, edges = network
+    with stage("network") as counters:
+        # Lines get wider with the number of passes between the pair
+        width = 1 + 9 * edges.passes / edges.passes.max()
+        pitch.lines(edges.x, edges.y, edges.end_x, edges.end_y, lw=width, color='#00FFFF', alpha=0.6, zorder=1, ax=ax)
+        pitch.scatter(nodes.x, nodes.y, s=100 + 8 * nodes.touches, color='#a50044', edgecolors='#edbb00', linewidth=2, zorder=2, ax=ax)
+        for name, node in nodes.iterrows():
+            pitch.annotate(name.split()[-1], xy=(node.x, node.y), c='white', va='center', ha='center', size=9, weight='bold', zorder=3, ax=ax)
+        counters["artists"] = len(ax.get_children())
+
+    draw_endnote(ax)
+
+
+def draw_team_shape(team_data, network, pitch, ax):
+    nodes, _ = network
+    on_ball = team_data[~team_data['typeId'].isin(NON_PITCH_TYPES) & team_data['playerName'].notna()]
+    colors = matplotlib.colormaps['tab20']
+    with stage("hulls") as counters:
+        # Each player's area, as in the CONVEX HULL view, under their average position
+        for i, (name, events) in enumerate(on_ball.groupby(on_ball['playerName'].astype(str))):
+            color = colors(i % colors.N)
+            if has_area(events.x, events.y):
+                hull = pitch.convexhull(events.x, events.y)
+                pitch.polygon(hull, color=color, alpha=0.15, ax=ax)
+            if name in nodes.index:
+                node = nodes.loc[name]
+                pitch.scatter(node.x, node.y, s=300, color=color, edgecolors='#FFFFFF', linewidth=1, zorder=2, ax=ax)
+                pitch.annotate(name.split()[-1], xy=(node.x - 3, node.y), c='white', va='top', ha='center', size=9, zorder=3, ax=ax)
+        counters["artists"] = len(ax.get_children())
+
+    draw_endnote(ax)
+
+
+TEAM_VIEW_DRAWERS = {
+    "PASS NETWORK": draw_pass_network,
+    "TEAM SHAPE": draw_team_shape,
+}
+
+
+VIEW_DRAWERS = {
+    "ALL ACTIONS IN THE MATCH": draw_all_actions,
+    "PASSES AND HEATMAP": draw_passes_and_heatmap,
+    "OFFENSIVE ACTIONS": draw_offensive_actions,
+    "DEFENSIVE ACTIONS": draw_defensive_actions,
+    "CONVEX HULL": draw_convex_hull,
+}
+
+
+def draw_pitch():
+    """A black vertical Opta pitch on a new 10 x 10 inch figure; returns (pitch, fig, ax)."""
+    with stage("pitch"):
+        pitch = VerticalPitch(pitch_type='opta', pitch_color='black', line_color='white', linewidth=3, corner_arcs=True)
+        # Not created through pyplot, so no global figure manager keeps a reference
+        fig = Figure(figsize=(10, 10), constrained_layout=True)
+        ax = fig.add_subplot()
+        pitch.draw(ax=ax)
+        fig.set_facecolor('black')
+    return pitch, fig, ax
+
+
+def draw_view(filtered_data, selected_player, view, type_runs=None):
+    """Draw one view of a player's events on a fresh pitch and return the figure.
+
+    ``type_runs`` are the player's PlayerIndex.type_runs, when the index has them.
+    """
+    pitch, fig, ax = draw_pitch()
+
+    VIEW_DRAWERS[view](filtered_data, selected_player, pitch, ax, type_runs)
+    return fig
+
+
+def draw_team_view(team_data, network, view):
+    """Draw one team view of a match on a fresh pitch and return the figure.
+
+    ``network`` is the (nodes, edges) pair of team_views.pass_network.
+    """
+    pitch, fig, ax = draw_pitch()
+
+    TEAM_VIEW_DRAWERS[view](team_data, network, pitch, ax)
+    return fig
@@ -0,0 +1,198 @@
+"""Event categories the views draw, assigned to every event in one pass.
+
+Each rule in CATEGORIES matches an Opta typeId, optionally an outcome (None
+matches any) and optionally a boolean flag column such as own_goal. The first
+matching rule wins, so refined rules (own goal, assist, key pass) are listed
+before the plain typeId rule they refine. Rules with a "style" are drawn as
+markers with those pitch.scatter arguments.
+
+The assist and keyPass flags only refine passes. The few other events that
+carry them, mostly shots and ball touches without end coordinates, keep their
+own category and are not drawn as assist or key pass lines.
+
+Frames whose rows are grouped by typeId, as a player's rows in the match
+store are, can pass the typeId runs from PlayerIndex.type_runs to
+split_events; each run is then classified by its typeId alone and most
+categories come out as plain row slices.
+"""
+import numpy as np
+import pandas as pd
+
+from profiling import stage
+
+CATEGORIES = [
+    # Refinements of a plain rule below
+    {"name": "own_goal", "typeId": 16, "flag": "own_goal", "style": {"s": 120, "c": "red", "edgecolor": "orange", "label": "Own Goal"}},
+    {"name": "assist", "typeId": 1, "outcome": 1, "flag": "assist"},
+    # An assist or key pass whose pass failed is also drawn as an incomplete pass
+    {"name": "assist_incomplete", "typeId": 1, "outcome": 0, "flag": "assist"},
+    {"name": "key_pass", "typeId": 1, "outcome": 1, "flag": "keyPass"},
+    {"name": "key_pass_incomplete", "typeId": 1, "outcome": 0, "flag": "keyPass"},
+
+    {"name": "goal", "typeId": 16, "style": {"s": 120, "c": "#00ff00", "edgecolors": "#06402b", "label": "Goal", "marker": "football"}},
+    {"name": "shot_saved", "typeId": 15, "style": {"s": 120, "c": "#ff7c60", "edgecolors": "#000000", "label": "Saved/Blocked Shot", "marker": "football"}},
+    {"name": "shot_post", "typeId": 14, "style": {"s": 120, "c": "w", "edgecolors": "#000000", "label": "Shot Off Woodwork", "marker": "football"}},
+    {"name": "shot_miss", "typeId": 13, "style": {"s": 120, "c": "r", "edgecolors": "#000000", "label": "Shot Off Target", "marker": "football"}},
+    {"name": "pass_complete", "typeId": 1, "outcome": 1},
+    {"name": "pass_incomplete", "typeId": 1, "outcome": 0},
+    {"name": "dribble", "typeId": 3, "outcome": 1, "style": {"s": 200, "c": "#009afd", "marker": "*", "edgecolor": "#000000", "label": "Dribble"}},
+    {"name": "tackle", "typeId": 7, "style": {"s": 130, "c": "#bebebe", "marker": "H", "edgecolor": "#000000", "label": "Tackle"}},
+    {"name": "recovery", "typeId": 49, "style": {"s": 130, "c": "#fcd200", "marker": "H", "edgecolor": "#000000", "label": "Ball Recovery"}},
+    {"name": "block", "typeId": 10, "style": {"s": 130, "c": "cyan", "marker": "H", "edgecolor": "#000000", "label": "Block"}},
+    {"name": "interception", "typeId": 8, "style": {"s": 130, "c": "#ff007f", "marker": "H", "edgecolor": "#000000", "label": "Interception"}},
+    {"name": "clearance", "typeId": 12, "style": {"s": 100, "c": "#9999ff", "marker": "x", "edgecolor": "#000000", "label": "Clearance"}},
+    {"name": "offside", "typeId": 55, "style": {"s": 120, "c": "#fcd200", "marker": "P", "edgecolor": "#000000", "label": "Offside Provoked"}},
+    {"name": "shield", "typeId": 56, "style": {"s": 50, "c": "#dd571c", "marker": "D", "edgecolor": "#000000", "label": "Shielding Ball Out"}},
+    {"name": "foul_won", "typeId": 4, "outcome": 1, "style": {"s": 120, "c": "#008000", "marker": "X", "edgecolor": "#000000", "label": "Foul Won"}},
+    {"name": "foul_committed", "typeId": 4, "outcome": 0, "style": {"s": 120, "c": "#c21919", "marker": "X", "edgecolor": "#000000", "label": "Foul Committed"}},
+    {"name": "aerial_won", "typeId": 44, "outcome": 1, "style": {"s": 100, "c": "#008000", "marker": "^", "edgecolor": "#000000", "label": "Aerial Won"}},
+    {"name": "aerial_lost", "typeId": 44, "outcome": 0, "style": {"s": 100, "c": "#c21919", "marker": "^", "edgecolor": "#000000", "label": "Aerial Lost"}},
+    {"name": "dispossessed", "typeId": 50, "style": {"s": 100, "c": "#cb0000", "marker": "p", "edgecolor": "#000000", "label": "Dispossessed"}},
+    {"name": "dribbled_past", "typeId": 45, "style": {"s": 50, "c": "#cb0000", "marker": "x", "edgecolor": "#000000", "label": "Dribbled Past"}},
+    {"name": "punch", "typeId": 41, "style": {"s": 100, "c": "#ffec00", "marker": "o", "edgecolor": "#000000", "label": "Punch"}},
+    {"name": "pickup", "typeId": 52, "style": {"s": 120, "c": "#dd571c", "marker": "+", "edgecolor": "#000000", "label": "Pick-Up"}},
+]
+
+# Opta types without an on-ball pitch location: offside pass, card, player off/on, deleted event
+NON_PITCH_TYPES = [2, 17, 18, 19, 43]
+
+# Opta types of a player playing or holding the ball, so the player can have received a pass
+TOUCH_TYPES = [1, 2, 3, 7, 8, 10, 11, 12, 13, 14, 15, 16, 41, 42, 44, 49, 50, 52, 54, 61, 74]
+
+GOALKEEPERS = ["Wojciech Szczesny", "Wojciech Szczęsny", "Inaki Pena", "Iñaki Peña", "Marc-Andre ter Stegen"]
+
+# Goalkeepers' blocks are saves
+GOALKEEPER_STYLES = {"block": {"s": 200, "c": "#00ff00", "marker": "*", "edgecolor": "#000000", "label": "Save"}}
+
+# Categories making up all of a player's passes
+PASS_CATEGORIES = ["pass_complete", "pass_incomplete", "assist", "assist_incomplete", "key_pass", "key_pass_incomplete"]
+
+# Categories drawn as assists, as key passes, and as incomplete passes
+ASSIST_CATEGORIES = ["assist", "assist_incomplete"]
+KEY_PASS_CATEGORIES = ["key_pass", "key_pass_incomplete"]
+INCOMPLETE_PASS_CATEGORIES = ["pass_incomplete", "assist_incomplete", "key_pass_incomplete"]
+
+# Shot marker layers; own goals are also goals
+SHOT_LAYERS = [("goal", "own_goal"), "shot_saved", "shot_post", "shot_miss"]
+
+# Marker layers of the action views, for outfield players and for goalkeepers
+VIEW_MARKERS = {
+    "ALL ACTIONS IN THE MATCH": (
+        ['dribble', 'tackle', 'recovery', 'block', 'interception', 'clearance', 'offside', 'shield', 'foul_won', 'foul_committed',
+         'aerial_won', 'aerial_lost', 'dispossessed', 'dribbled_past', 'own_goal'],
+        ['block', 'punch', 'pickup', 'dribble', 'tackle', 'recovery', 'interception', 'clearance', 'offside', 'shield',
+         'foul_won', 'foul_committed', 'dispossessed', 'dribbled_past', 'own_goal'],
+    ),
+    "OFFENSIVE ACTIONS": (
+        ['dribble', 'foul_won', 'foul_committed', 'aerial_won', 'aerial_lost', 'dispossessed'],
+        ['dribble', 'foul_won', 'foul_committed', 'aerial_won', 'aerial_lost', 'dispossessed'],
+    ),
+    "DEFENSIVE ACTIONS": (
+        ['tackle', 'recovery', 'block', 'interception', 'clearance', 'offside', 'shield', 'foul_won', 'foul_committed',
+         'aerial_won', 'aerial_lost', 'dispossessed', 'dribbled_past', 'own_goal'],
+        ['block', 'punch', 'pickup', 'tackle', 'recovery', 'interception', 'clearance', 'shield', 'foul_won', 'foul_committed',
+         'dispossessed', 'dribbled_past', 'own_goal'],
+    ),
+}
+
+CATEGORY_NAMES = [category["name"] for category in CATEGORIES]
+CATEGORY_STYLES = {category["name"]: category["style"] for category in CATEGORIES if "style" in category}
+
+# Code of events no rule matches
+UNMATCHED = len(CATEGORIES)
+
+# Lowest matching plain-rule code per (typeId, outcome != 0)
+_lookup = np.full((128, 2), UNMATCHED, dtype=np.int16)
+for code, category in reversed(list(enumerate(CATEGORIES))):
+    if "flag" not in category:
+        outcomes = [0, 1] if category.get("outcome") is None else [int(category["outcome"] != 0)]
+        _lookup[category["typeId"], outcomes] = code
+
+
+# Flag rules of each typeId, with their codes
+_flag_rules = {}
+for code, category in enumerate(CATEGORIES):
+    if "flag" in category:
+        _flag_rules.setdefault(category["typeId"], []).append((code, category))
+
+
+def classify_events(df):
+    """Category code of every event, indexing CATEGORIES (UNMATCHED for none)."""
+    type_ids = df["typeId"].to_numpy(dtype=np.intp)
+    outcomes = (df["outcome"].to_numpy() != 0).astype(np.intp)
+    codes = _lookup[type_ids, outcomes]
+
+    # Flag rules refine the table lookup; keep whichever rule comes first
+    for code, category in enumerate(CATEGORIES):
+        if "flag" in category:
+            hits = (type_ids == category["typeId"]) & df[category["flag"]].to_numpy().astype(bool)
+            if category.get("outcome") is not None:
+                hits &= outcomes == int(category["outcome"] != 0)
+            codes = np.where(hits, np.minimum(codes, code), codes)
+    return codes
+
+
+def run_bounds(df, type_runs):
+    """(typeId, start, stop) of each run of type_runs, or None unless they describe df's rows."""
+    type_ids, starts = type_runs
+    stops = np.append(starts[1:], len(df)).astype(np.intp)
+    lengths = stops - starts
+    # A frame cached from another version of the match would be cut at the wrong rows
+    if (lengths <= 0).any() or lengths.sum() != len(df) or not np.array_equal(np.repeat(type_ids, lengths), df["typeId"].to_numpy()):
+        return None
+    return list(zip(type_ids.tolist(), starts.tolist(), stops.tolist()))
+
+
+def classify_runs(df, bounds):
+    """classify_events for rows grouped by typeId, one run at a time."""
+    outcomes = (df["outcome"].to_numpy() != 0).astype(np.intp)
+    codes = np.empty(len(df), dtype=np.int16)
+    for type_id, start, stop in bounds:
+        run_outcomes = outcomes[start:stop]
+        run = _lookup[type_id, run_outcomes]
+        for code, category in _flag_rules.get(type_id, []):
+            hits = df[category["flag"]].to_numpy()[start:stop].astype(bool)
+            if category.get("outcome") is not None:
+                hits &= run_outcomes == int(category["outcome"] != 0)
+            run = np.where(hits, np.minimum(run, code), run)
+        codes[start:stop] = run
+    return codes
+
+
+def split_events(df, type_runs=None):
+    """Events grouped by category name; categories without events are empty frames.
+
+    ``type_runs`` are the (typeIds, starts) of PlayerIndex.type_runs for df;
+    they are ignored unless df's typeId column matches them.
+    """
+    with stage("event classify") as counters:
+        groups = dict.fromkeys(CATEGORY_NAMES, df.iloc[:0])
+        bounds = run_bounds(df, type_runs) if type_runs is not None else None
+        if bounds is None:
+            for code, group in df.groupby(classify_events(df), sort=False):
+                if code != UNMATCHED:
+                    groups[CATEGORY_NAMES[code]] = group
+        else:
+            codes = classify_runs(df, bounds)
+            order = np.argsort(codes, kind="stable")
+            for rows in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+                if len(rows) and codes[rows[0]] != UNMATCHED:
+                    # Categories of a single run, or of adjacent ones, are contiguous rows
+                    contiguous = rows[-1] - rows[0] == len(rows) - 1
+                    groups[CATEGORY_NAMES[codes[rows[0]]]] = df.iloc[rows[0]:rows[-1] + 1] if contiguous else df.iloc[rows]
+        counters["rows"] = len(df)
+        counters["type runs"] = bounds is not None
+    return groups
+
+
+def view_markers(view, player_name):
+    """Marker layers of an action view, and the style overrides, for this player."""
+    outfield, goalkeeper = VIEW_MARKERS[view]
+    if player_name in GOALKEEPERS:
+        return goalkeeper, GOALKEEPER_STYLES
+    return outfield, {}
+
+
+def select(groups, *names):
+    """Events of several categories in one frame."""
+    return pd.concat([groups[name] for name in names])
@@ -0,0 +1,156 @@
+"""Action views drawn in the browser from compact coordinate arrays.
+
+interactive_figure builds a Plotly figure of a player's events instead of a
+rendered image: one WebGL trace per layer, styled like the matplotlib views,
+with coordinates rounded to a tenth of a pitch unit. The figure carries the
+layers of every INTERACTIVE_VIEWS view at once, and its own buttons switch
+between them in the browser without a server rerun; clicking a legend entry
+hides or shows a layer. The figure is a plain dict, so building it imports
+neither plotly nor matplotlib.
+"""
+import numpy as np
+
+from event_categories import ASSIST_CATEGORIES, CATEGORY_STYLES, GOALKEEPERS, INCOMPLETE_PASS_CATEGORIES, KEY_PASS_CATEGORIES, PASS_CATEGORIES, SHOT_LAYERS, select, split_events, view_markers
+from profiling import stage
+
+# Views the interactive figure can switch between
+INTERACTIVE_VIEWS = ["ALL ACTIONS IN THE MATCH", "OFFENSIVE ACTIONS", "DEFENSIVE ACTIONS"]
+
+# Plotly symbols of the matplotlib markers the categories use
+MARKER_SYMBOLS = {"o": "circle", "football": "circle", "*": "star", "H": "hexagon2", "x": "x-thin", "P": "cross", "D": "diamond",
+                  "X": "x", "^": "triangle-up", "p": "pentagon", "+": "cross-thin"}
+
+# Markers drawn as lines only, coloured with c as plt.scatter does
+UNFILLED_MARKERS = {"x", "+"}
+
+# Matplotlib single-letter colours, which browsers do not know
+SHORT_COLORS = {"r": "#ff0000", "w": "#ffffff", "k": "#000000", "g": "#008000", "b": "#0000ff", "y": "#bfbf00"}
+
+# Opta units per metre along (Opta x, Opta y) of a 105 x 68 m pitch
+PITCH_SCALE = (100 / 105, 100 / 68)
+
+# Pitch markings as (Opta x from, Opta x to, Opta y from, Opta y to) rectangles
+PITCH_BOXES = [(0, 100, 0, 100), (0, 17, 21.1, 78.9), (83, 100, 21.1, 78.9), (0, 5.8, 36.8, 63.2), (94.2, 100, 36.8, 63.2)]
+
+ENDNOTE = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
+
+
+def css_color(color):
+    return SHORT_COLORS.get(color, color)
+
+
+def coords(values):
+    """Values as a JSON-ready list rounded to 0.1, with missing values as None."""
+    rounded = np.round(np.asarray(values, dtype=float), 1)
+    return [None if np.isnan(value) else value for value in rounded.tolist()]
+
+
+def marker_trace(events, style):
+    """Scatter trace of events drawn with a pitch.scatter style."""
+    marker = style.get("marker", "o")
+    edge = css_color(style.get("edgecolor", style.get("edgecolors", "#000000")))
+    color = css_color(style["c"])
+    # The vertical pitch puts Opta y across and Opta x up
+    return {
+        "type": "scattergl", "mode": "markers", "name": style["label"], "x": coords(events.y), "y": coords(events.x),
+        "marker": {"symbol": MARKER_SYMBOLS[marker], "size": round(float(np.sqrt(style["s"])), 1), "color": color,
+                   "line": {"color": color if marker in UNFILLED_MARKERS else edge, "width": 1.5}},
+        "hoverinfo": "name",
+    }
+
+
+def line_trace(events, color, name, width):
+    """Segments from each event's start to its end, as one line trace broken by gaps."""
+    gaps = np.full(len(events), np.nan)
+    x = np.column_stack([events.y, events.end_y, gaps]).ravel()
+    y = np.column_stack([events.x, events.end_x, gaps]).ravel()
+    return {"type": "scattergl", "mode": "lines", "name": name, "x": coords(x), "y": coords(y), "line": {"color": color, "width": width}, "hoverinfo": "name"}
+
+
+def heatmap_trace(passes):
+    """Pass density, binned and shaded by the browser."""
+    return {
+        "type": "histogram2dcontour", "name": "Pass Heatmap", "x": coords(passes.y), "y": coords(passes.x),
+        "colorscale": "Magma", "opacity": 0.4, "ncontours": 10, "showscale": False,
+        "contours": {"coloring": "fill", "showlines": False}, "hoverinfo": "skip", "showlegend": True,
+    }
+
+
+def view_layers(events, player_name, type_runs=None):
+    """(trace, views showing it) for every layer of the interactive views, in drawing order."""
+    groups = split_events(events, type_runs)
+    goalkeeper = player_name in GOALKEEPERS
+    every_view = set(INTERACTIVE_VIEWS)
+    chance_views = {"OFFENSIVE ACTIONS"} if goalkeeper else {"ALL ACTIONS IN THE MATCH", "OFFENSIVE ACTIONS"}
+
+    layers = [(heatmap_trace(select(groups, *PASS_CATEGORIES)), every_view)]
+    for layer in SHOT_LAYERS:
+        names = (layer,) if isinstance(layer, str) else layer
+        layers.append((marker_trace(select(groups, *names), CATEGORY_STYLES[names[0]]), chance_views))
+    layers.append((line_trace(select(groups, *ASSIST_CATEGORIES), "#00ff00", "Assist", 2.5), chance_views))
+    layers.append((line_trace(select(groups, *KEY_PASS_CATEGORIES), "#ffea00", "Key Pass", 2.5), chance_views))
+    layers.append((line_trace(select(groups, "pass_complete", "assist"), "#00ff00", "Completed Pass", 1), {"ALL ACTIONS IN THE MATCH"}))
+    layers.append((line_trace(select(groups, *INCOMPLETE_PASS_CATEGORIES), "red", "Incomplete Pass", 1), {"ALL ACTIONS IN THE MATCH"}))
+
+    # A category shown by several views gets one trace
+    marker_views = {}
+    marker_styles = {}
+    for view in INTERACTIVE_VIEWS:
+        names, styles = view_markers(view, player_name)
+        for name in names:
+            marker_views.setdefault(name, set()).add(view)
+            marker_styles[name] = {**CATEGORY_STYLES[name], **styles.get(name, {})}
+    for name, views in marker_views.items():
+        layers.append((marker_trace(groups[name], marker_styles[name]), views))
+    # Layers without events would only add legend entries
+    return [(trace, views) for trace, views in layers if trace["x"]]
+
+
+def pitch_shapes():
+    """Pitch markings of a vertical Opta pitch, as layout shapes."""
+    line = {"color": "white", "width": 2}
+    shapes = [{"type": "rect", "x0": y0, "x1": y1, "y0": x0, "y1": x1, "line": line, "layer": "below"} for x0, x1, y0, y1 in PITCH_BOXES]
+    shapes.append({"type": "line", "x0": 0, "x1": 100, "y0": 50, "y1": 50, "line": line, "layer": "below"})
+    radius_x, radius_y = 9.15 * PITCH_SCALE[0], 9.15 * PITCH_SCALE[1]
+    shapes.append({"type": "circle", "x0": 50 - radius_y, "x1": 50 + radius_y, "y0": 50 - radius_x, "y1": 50 + radius_x, "line": line, "layer": "below"})
+    return shapes
+
+
+def interactive_figure(events, player_name, view=INTERACTIVE_VIEWS[0], type_runs=None):
+    """Plotly figure dict of a player's events, opened on ``view``.
+
+    ``type_runs`` are the player's PlayerIndex.type_runs, when the index has them.
+    """
+    with stage("interactive figure") as counters:
+        layers = view_layers(events, player_name, type_runs)
+        data = [dict(trace, visible=view in views) for trace, views in layers]
+        buttons = [
+            {"label": name.title(), "method": "restyle", "args": [{"visible": [name in views for _, views in layers]}]}
+            for name in INTERACTIVE_VIEWS
+        ]
+        axis = {"range": [0, 100], "visible": False, "fixedrange": True}
+        layout = {
+            "paper_bgcolor": "black", "plot_bgcolor": "black", "height": 800, "margin": {"l": 10, "r": 10, "t": 90, "b": 40},
+            # Opta y runs right to left on a vertical pitch, as in mplsoccer's VerticalPitch
+            "xaxis": {**axis, "range": [100, 0]},
+            "yaxis": {**axis, "scaleanchor": "x", "scaleratio": PITCH_SCALE[1] / PITCH_SCALE[0]},
+            "shapes": pitch_shapes(),
+            "legend": {"orientation": "h", "x": 0, "y": 1.02, "yanchor": "bottom", "font": {"color": "white", "size": 10}, "bgcolor": "rgba(0,0,0,0.5)"},
+            "updatemenus": [{"type": "buttons", "direction": "right", "x": 0, "y": 1.12, "yanchor": "bottom", "showactive": True,
+                             "active": INTERACTIVE_VIEWS.index(view), "buttons": buttons}],
+            "annotations": [{"text": ENDNOTE, "x": 0.5, "y": -0.03, "xref": "paper", "yref": "paper", "showarrow": False, "font": {"color": "white", "size": 13}}],
+        }
+        counters["rows"] = len(events)
+        counters["traces"] = len(data)
+    return {"data": data, "layout": layout}
+
+
+def open_view(figure, view):
+    """An interactive_figure opened on another view, as its button for that view would show it."""
+    menu = figure["layout"]["updatemenus"][0]
+    number = INTERACTIVE_VIEWS.index(view)
+    visible = menu["buttons"][number]["args"][0]["visible"]
+    return {
+        "data": [dict(trace, visible=shown) for trace, shown in zip(figure["data"], visible)],
+        "layout": dict(figure["layout"], updatemenus=[dict(menu, active=number)]),
+    }
@@ -0,0 +1,175 @@
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from profiling import record_stage, stage
+
+# Team whose events the app visualizes
+TEAM_NAME = "Barcelona"
+
+QUALIFIER_ID_SUFFIX = "/qualifierId"
+QUALIFIER_VALUE_SUFFIX = "/value"
+
+# Opta qualifier ids decoded into their own float columns
+QUALIFIER_FIELDS = {140: "end_x", 141: "end_y"}
+
+# Qualifier value marking a goal as an own goal
+OWN_GOAL_VALUE = "OWN_GOAL"
+
+# Rows parsed at a time by load_match; matches have about 2,000 rows, so they are read in one pass
+CSV_CHUNK_ROWS = 100_000
+
+# Columns the views need once the qualifiers are decoded, with compact dtypes
+EVENT_DTYPES = {
+    "id": "int64",
+    "eventId": "int16",
+    "typeId": "int8",
+    "periodId": "int8",
+    "timeMin": "int16",
+    "timeSec": "int8",
+    "outcome": "int8",
+    "x": "float32",
+    "y": "float32",
+    "end_x": "float32",
+    "end_y": "float32",
+    "playerId": "category",
+    "playerName": "category",
+    "keyPass": "int8",
+    "assist": "int8",
+    "own_goal": "bool",
+}
+
+
+def qualifier_column_pairs(columns):
+    """Return (id column, value column or None) pairs in frame order."""
+    columns = list(columns)
+    present = set(columns)
+    pairs = []
+    for col in columns:
+        if col.startswith("qualifier/") and col.endswith(QUALIFIER_ID_SUFFIX):
+            value_col = col[: -len(QUALIFIER_ID_SUFFIX)] + QUALIFIER_VALUE_SUFFIX
+            pairs.append((col, value_col if value_col in present else None))
+    return pairs
+
+
+def decode_qualifiers(df, fields=QUALIFIER_FIELDS):
+    """Decode the wide qualifier/N/* columns into one typed column per wanted qualifier.
+
+    The id/value pairs are stacked once into two (rows x slots) arrays. When a
+    qualifier id appears in several slots the right-most one wins, which is what
+    the old row-by-row loop produced. The result also carries an ``own_goal``
+    flag, set when any qualifier value is OWN_GOAL.
+    """
+    pairs = qualifier_column_pairs(df.columns)
+    n_rows = len(df)
+    decoded = pd.DataFrame(index=df.index)
+
+    if not pairs:
+        for name in fields.values():
+            decoded[name] = np.full(n_rows, np.nan, dtype=np.float64)
+        decoded["own_goal"] = np.zeros(n_rows, dtype=bool)
+        return decoded
+
+    missing = np.full(n_rows, np.nan, dtype=object)
+    ids = np.column_stack([pd.to_numeric(df[id_col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan) for id_col, _ in pairs])
+    values = np.column_stack([df[value_col].to_numpy(dtype=object) if value_col else missing for _, value_col in pairs])
+
+    rows = np.arange(n_rows)
+    last_slot = ids.shape[1] - 1
+    for qualifier_id, name in fields.items():
+        hits = ids == qualifier_id
+        # Index of the right-most matching slot in each row
+        slot = last_slot - np.argmax(hits[:, ::-1], axis=1)
+        column = pd.to_numeric(pd.Series(values[rows, slot]), errors="coerce").to_numpy(dtype=np.float64)
+        decoded[name] = np.where(hits.any(axis=1), column, np.nan)
+
+    decoded["own_goal"] = (values == OWN_GOAL_VALUE).any(axis=1)
+    return decoded
+
+
+def compact_events(df):
+    """Keep only EVENT_DTYPES columns, cast to their compact dtypes.
+
+    keyPass and assist are only present (as 1) on the events they flag, so
+    missing values become 0.
+    """
+    columns = {}
+    for col, dtype in EVENT_DTYPES.items():
+        series = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        if col in ("keyPass", "assist"):
+            series = series.fillna(0)
+        columns[col] = series.astype(dtype)
+    return pd.DataFrame(columns, index=df.index).reset_index(drop=True)
+
+
+def ingest_columns(header):
+    """Columns to read from a CSV with this header, and the dtypes to read them as.
+
+    Only the EVENT_DTYPES columns, teamName and the qualifier id/value pairs
+    are read. Qualifier slots differ between CSVs, so they come from the
+    header of each file.
+    """
+    present = set(header)
+    columns = [col for col in EVENT_DTYPES if col in present] + ["teamName"]
+    dtypes = {"teamName": "object", "playerId": "object", "playerName": "object", "x": "float32", "y": "float32"}
+    for id_col, value_col in qualifier_column_pairs(header):
+        columns.append(id_col)
+        dtypes[id_col] = "float64"
+        if value_col:
+            columns.append(value_col)
+            # Values mix numbers and labels such as OWN_GOAL
+            dtypes[value_col] = "object"
+    return columns, {col: dtype for col, dtype in dtypes.items() if col in columns}
+
+
+def load_match(match_file_path, chunksize=CSV_CHUNK_ROWS):
+    """Read a match CSV and return Barcelona's events with decoded qualifier columns.
+
+    Only the needed columns are parsed, and each chunk of rows is cut down to
+    Barcelona's rows and its qualifiers decoded before the next is read. A
+    match fits in one chunk; only unusually long CSVs are read in several.
+    """
+    header = pd.read_csv(match_file_path, nrows=0).columns
+    columns, dtypes = ingest_columns(header)
+    event_columns = [col for col in columns if col in EVENT_DTYPES]
+
+    # Seconds and rows of each step, summed over the chunks
+    steps = {name: [0.0, 0] for name in ("csv parse", "team filter", "qualifier decode")}
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        steps[name][0] += time.perf_counter() - start
+        steps[name][1] += len(result) if result is not None else 0
+        return result
+
+    parts = []
+    with pd.read_csv(match_file_path, usecols=columns, dtype=dtypes, chunksize=chunksize) as reader:
+        chunks = iter(reader)
+        while (chunk := timed("csv parse", next, chunks, None)) is not None:
+            chunk = timed("team filter", lambda chunk: chunk[chunk["teamName"] == TEAM_NAME], chunk)
+            decoded = timed("qualifier decode", decode_qualifiers, chunk)
+            parts.append(chunk[event_columns].assign(**{col: decoded[col] for col in decoded.columns}))
+    for name, (seconds, rows) in steps.items():
+        record_stage(name, seconds, rows=rows)
+    with stage("compact columns"):
+        return compact_events(pd.concat(parts))
+
+
+def canonical_name(name):
+    """Player name without accents, so spellings such as "Iñaki Peña" and "Inaki Pena" compare equal."""
+    return "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+
+
+def sort_by_player(df):
+    """Order events by canonical player name, then typeId, then event order.
+
+    Each player's events, and each event type within them, become contiguous
+    rows; events without a player come last.
+    """
+    keys = df["playerName"].astype(object).map(canonical_name, na_action="ignore")
+    order = pd.DataFrame({"player": keys, "typeId": df["typeId"], "id": df["id"]}).sort_values(
+        ["player", "typeId", "id"], kind="stable", na_position="last").index
+    return df.loc[order].reset_index(drop=True)
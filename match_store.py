@@ -0,0 +1,299 @@
+"""Columnar copy of the Matches/ CSV tree.
+
+Each CSV under Matches/<competition>/ becomes
+match_store/<competition>/<match>.parquet holding only Barcelona's events,
+the match_data.EVENT_DTYPES columns and the decoded qualifiers, sorted by
+player and event type. match_store/index.npz maps every player to its row
+range in each match and every event type to its rows within that range.
+Build or refresh both with:
+
+    python match_store.py [--matches Matches] [--store match_store] [--force]
+"""
+import argparse
+import glob
+import os
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+from match_data import canonical_name, load_match, sort_by_player
+from profiling import stage
+
+MATCHES_FOLDER = "Matches"
+STORE_FOLDER = "match_store"
+INDEX_NAME = "index.npz"
+
+
+def store_path(match_file_path, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER):
+    """Path of the converted copy of a match CSV."""
+    relative = os.path.relpath(match_file_path, matches_folder)
+    return os.path.join(store_folder, os.path.splitext(relative)[0] + ".parquet")
+
+
+def match_key(match_file_path, matches_folder=MATCHES_FOLDER):
+    """Match CSV path relative to the matches folder, with forward slashes."""
+    return os.path.relpath(match_file_path, matches_folder).replace(os.sep, "/")
+
+
+def is_stale(match_file_path, converted_path):
+    """True when the converted copy is missing or older than its CSV."""
+    if not os.path.exists(converted_path):
+        return True
+    return os.path.getmtime(match_file_path) > os.path.getmtime(converted_path)
+
+
+def store_stamp(converted_path):
+    """(mtime, size) of a store file, as the index records it."""
+    stat = os.stat(converted_path)
+    return stat.st_mtime, stat.st_size
+
+
+def same_stamp(stamp, other):
+    """True when two store_stamps describe the same store file.
+
+    Copies, archives and some filesystems keep mtimes to the whole second,
+    so a whole-second mtime also matches a finer one within that second.
+    """
+    (mtime, size), (other_mtime, other_size) = stamp, other
+    if size != other_size:
+        return False
+    if mtime.is_integer() or other_mtime.is_integer():
+        return abs(mtime - other_mtime) < 1
+    return mtime == other_mtime
+
+
+def convert_match(match_file_path, converted_path):
+    # Sorted so the index can address players and event types as row ranges
+    df = sort_by_player(load_match(match_file_path))
+    os.makedirs(os.path.dirname(converted_path), exist_ok=True)
+    # Write next to the target and swap in, so readers never see a partial file
+    tmp_path = converted_path + ".tmp"
+    df.to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, converted_path)
+    return df
+
+
+def build_store(matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER, force=False):
+    """Convert every stale match CSV. Returns (converted, skipped) paths."""
+    converted, skipped = [], []
+    for match_file_path in sorted(glob.glob(os.path.join(matches_folder, "*", "*.csv"))):
+        converted_path = store_path(match_file_path, matches_folder, store_folder)
+        if force or is_stale(match_file_path, converted_path):
+            convert_match(match_file_path, converted_path)
+            converted.append(converted_path)
+        else:
+            skipped.append(converted_path)
+    return converted, skipped
+
+
+def runs(values):
+    """Start of every run of equal values, plus the end of the last run."""
+    if len(values) == 0:
+        return np.zeros(1, dtype=np.int32)
+    starts = np.flatnonzero(values[1:] != values[:-1]) + 1
+    return np.concatenate([[0], starts, [len(values)]]).astype(np.int32)
+
+
+def index_entries(converted_path):
+    """Index entries of one store file, whose rows convert_match sorted by player.
+
+    Each entry is (player key, spelling in the match, playerId, row start,
+    row stop, type ids, type starts) for one player of the match; the type
+    starts are offsets within the player's rows.
+    """
+    df = pd.read_parquet(converted_path, engine="pyarrow", columns=["playerName", "playerId", "typeId"])
+    names = df["playerName"].astype(object).to_numpy()
+    keys = np.array([canonical_name(name) if isinstance(name, str) else "" for name in names], dtype=object)
+    type_ids = df["typeId"].to_numpy()
+    bounds = runs(keys)
+
+    entries = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if not keys[start]:
+            continue
+        name = Counter(names[start:stop]).most_common(1)[0][0]
+        type_bounds = runs(type_ids[start:stop])
+        entries.append((keys[start], name, str(df["playerId"].iloc[start]), start, stop, type_ids[start:stop][type_bounds[:-1]], type_bounds[:-1]))
+    return entries
+
+
+def build_index(matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER, previous=None):
+    """Write the player and event-type index of every up to date store file.
+
+    Players are keyed by canonical_name, so spelling variants of one player
+    share an entry. Each entry keeps the spelling its match uses, and the
+    spelling with the most events overall names the player across matches.
+    Matches whose store file is unchanged since the ``previous`` PlayerIndex
+    reuse its entries instead of being read again.
+    """
+    match_keys, match_stamps = [], []
+    entries = []  # (match number, player key, name, playerId, row start, row stop, type ids, type starts)
+    for match_file_path in sorted(glob.glob(os.path.join(matches_folder, "*", "*.csv"))):
+        converted_path = store_path(match_file_path, matches_folder, store_folder)
+        if is_stale(match_file_path, converted_path):
+            continue
+        key = match_key(match_file_path, matches_folder)
+        stamp = store_stamp(converted_path)
+        match_entries = previous.match_entries(key, stamp) if previous is not None else None
+        if match_entries is None:
+            match_entries = index_entries(converted_path)
+        entries += [(len(match_keys), *entry) for entry in match_entries]
+        match_keys.append(key)
+        match_stamps.append(stamp)
+
+    spellings = defaultdict(Counter)
+    player_ids = {}
+    for _, player_key, name, player_id, start, stop, _, _ in entries:
+        spellings[player_key][name] += stop - start
+        player_ids.setdefault(player_key, player_id)
+    player_keys = sorted(spellings)
+    player_numbers = {key: number for number, key in enumerate(player_keys)}
+    type_counts = [len(entry[6]) for entry in entries]
+    arrays = {
+        "match_keys": np.array(match_keys, dtype=str),
+        "match_mtimes": np.array([stamp[0] for stamp in match_stamps], dtype=np.float64),
+        "match_sizes": np.array([stamp[1] for stamp in match_stamps], dtype=np.int64),
+        "player_keys": np.array(player_keys, dtype=str),
+        "player_names": np.array([spellings[key].most_common(1)[0][0] for key in player_keys], dtype=str),
+        "player_ids": np.array([player_ids[key] for key in player_keys], dtype=str),
+        "entry_match": np.array([entry[0] for entry in entries], dtype=np.int16),
+        "entry_player": np.array([player_numbers[entry[1]] for entry in entries], dtype=np.int16),
+        # Spelling and playerId of each entry, so a later build can reuse it as is
+        "entry_name": np.array([entry[2] for entry in entries], dtype=str),
+        "entry_id": np.array([entry[3] for entry in entries], dtype=str),
+        "entry_start": np.array([entry[4] for entry in entries], dtype=np.int32),
+        "entry_stop": np.array([entry[5] for entry in entries], dtype=np.int32),
+        # Entry i's event types are type_ids[type_ptr[i]:type_ptr[i + 1]], starting at type_starts within its rows
+        "type_ptr": np.concatenate([[0], np.cumsum(type_counts)]).astype(np.int32),
+        "type_ids": np.concatenate([entry[6] for entry in entries] or [[]]).astype(np.int8),
+        "type_starts": np.concatenate([entry[7] for entry in entries] or [[]]).astype(np.int32),
+    }
+    os.makedirs(store_folder, exist_ok=True)
+    path = os.path.join(store_folder, INDEX_NAME)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+class PlayerIndex:
+    """Constant-time player lookups over the store, loaded from its index file."""
+
+    def __init__(self, arrays, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER):
+        self.matches_folder = matches_folder
+        self.store_folder = store_folder
+        self.arrays = arrays
+        self.match_stamps = dict(zip(arrays["match_keys"].tolist(), zip(arrays["match_mtimes"].tolist(), arrays["match_sizes"].tolist())))
+        player_keys = arrays["player_keys"].tolist()
+        self.names = dict(zip(player_keys, arrays["player_names"].tolist()))
+        self.keys_by_id = dict(zip(arrays["player_ids"].tolist(), player_keys))
+
+        self.entries = {}
+        self.match_players = defaultdict(list)
+        self.player_matches = defaultdict(list)
+        match_keys = arrays["match_keys"].tolist()
+        entry_names = arrays["entry_name"].tolist()
+        for number, (match_number, player_number) in enumerate(zip(arrays["entry_match"].tolist(), arrays["entry_player"].tolist())):
+            key, player_key = match_keys[match_number], player_keys[player_number]
+            self.entries[(key, player_key)] = number
+            self.match_players[key].append(entry_names[number])
+            self.player_matches[player_key].append(key)
+        for names in self.match_players.values():
+            names.sort()
+
+    @classmethod
+    def load(cls, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER):
+        """The index written by build_index, or None when there is none."""
+        try:
+            with np.load(os.path.join(store_folder, INDEX_NAME)) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        return cls(arrays, matches_folder, store_folder)
+
+    def match_entries(self, key, stamp):
+        """The index_entries of a match as indexed, or None unless its store file had this store_stamp."""
+        if key not in self.match_stamps or not same_stamp(self.match_stamps[key], stamp):
+            return None
+        arrays = self.arrays
+        match_number = arrays["match_keys"].tolist().index(key)
+        entries = []
+        for number in np.flatnonzero(arrays["entry_match"] == match_number):
+            first, last = arrays["type_ptr"][number], arrays["type_ptr"][number + 1]
+            start, stop = int(arrays["entry_start"][number]), int(arrays["entry_stop"][number])
+            entries.append((str(arrays["player_keys"][arrays["entry_player"][number]]), str(arrays["entry_name"][number]), str(arrays["entry_id"][number]),
+                            start, stop, arrays["type_ids"][first:last], arrays["type_starts"][first:last]))
+        return entries
+
+    def covers(self, match_file_path):
+        """True when the index describes the store file read_match would return."""
+        key = match_key(match_file_path, self.matches_folder)
+        converted_path = store_path(match_file_path, self.matches_folder, self.store_folder)
+        return (key in self.match_stamps and not is_stale(match_file_path, converted_path)
+                and same_stamp(store_stamp(converted_path), self.match_stamps[key]))
+
+    def player_key(self, player):
+        """Canonical key of a player name, spelling variant or playerId."""
+        return self.keys_by_id.get(player, canonical_name(player))
+
+    def players(self, match_file_path):
+        """Names of the players of a match as the match spells them, sorted."""
+        return self.match_players.get(match_key(match_file_path, self.matches_folder), [])
+
+    def matches_of(self, player):
+        """Keys of the matches a player has events in."""
+        return self.player_matches.get(self.player_key(player), [])
+
+    def player_rows(self, match_file_path, player):
+        """Row range of a player's events in a match's store frame, or None."""
+        number = self.entries.get((match_key(match_file_path, self.matches_folder), self.player_key(player)))
+        if number is None:
+            return None
+        return slice(int(self.arrays["entry_start"][number]), int(self.arrays["entry_stop"][number]))
+
+    def type_runs(self, match_file_path, player):
+        """(typeIds, offsets where each starts) of a player's rows in a match, or None.
+
+        The rows of each typeId follow one another, in typeId order, from the
+        offset given, relative to the start of player_rows.
+        """
+        number = self.entries.get((match_key(match_file_path, self.matches_folder), self.player_key(player)))
+        if number is None:
+            return None
+        first, last = self.arrays["type_ptr"][number], self.arrays["type_ptr"][number + 1]
+        return self.arrays["type_ids"][first:last], self.arrays["type_starts"][first:last]
+
+
+def read_match(match_file_path, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER):
+    """Barcelona's events for a match, from the store unless the CSV is newer.
+
+    Either way rows come in the store's player order, so row ranges of an
+    index built from this CSV version apply to the frame returned.
+    """
+    converted_path = store_path(match_file_path, matches_folder, store_folder)
+    if is_stale(match_file_path, converted_path):
+        # The watcher may convert and index this version before the frame leaves the cache
+        return sort_by_player(load_match(match_file_path))
+    # The Parquet schema keeps the EVENT_DTYPES dtypes, so no cast is needed
+    with stage("store read") as counters:
+        df = pd.read_parquet(converted_path, engine="pyarrow")
+        counters["rows"] = len(df)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar match store from the Matches/ CSVs.")
+    parser.add_argument("--matches", default=MATCHES_FOLDER, help="folder of <competition>/<match>.csv files")
+    parser.add_argument("--store", default=STORE_FOLDER, help="output folder for the Parquet files")
+    parser.add_argument("--force", action="store_true", help="rebuild every match, not only stale ones")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    converted, skipped = build_store(args.matches, args.store, args.force)
+    build_index(args.matches, args.store, PlayerIndex.load(args.matches, args.store))
+    print(f"Converted {len(converted)} matches, {len(skipped)} already up to date ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Picks up match CSVs added, changed or removed while the app runs.
+
+MatchWatcher.poll() rescans Matches/ at most every BARCA_WATCH_INTERVAL
+seconds (default 2) and compares the (mtime, size) of every CSV with the
+manifest of its previous scan. Only the matches that differ are then
+updated: their catalog entries, their store file when the store is in use,
+and the player index, which reuses the entries of every other match. The
+first scan treats matches whose store file is stale as changed, so CSVs
+dropped in while the app was down are converted too. A CSV that cannot be
+read is left out of the catalog with its error in MatchWatcher.errors, and
+read again once it changes; the other matches carry on.
+"""
+import os
+import threading
+import time
+
+from match_store import INDEX_NAME, MATCHES_FOLDER, STORE_FOLDER, PlayerIndex, build_index, convert_match, is_stale, store_path
+from season import catalog_entry
+
+WATCH_INTERVAL = float(os.environ.get("BARCA_WATCH_INTERVAL", 2))
+
+
+def scan_matches(matches_folder=MATCHES_FOLDER):
+    """(mtime, size) of every <competition>/<match>.csv, keyed by path."""
+    manifest = {}
+    with os.scandir(matches_folder) as competitions:
+        for competition in competitions:
+            if not competition.is_dir():
+                continue
+            with os.scandir(competition.path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".csv") and entry.is_file():
+                        stat = entry.stat()
+                        manifest[entry.path] = (stat.st_mtime, stat.st_size)
+    return manifest
+
+
+def diff_manifests(old, new):
+    """Paths added, changed and removed between two scans, each sorted."""
+    added = sorted(new.keys() - old.keys())
+    removed = sorted(old.keys() - new.keys())
+    changed = sorted(path for path in new.keys() & old.keys() if new[path] != old[path])
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+class MatchWatcher:
+    """Catalog of the Matches/ tree, kept up to date one match at a time."""
+
+    def __init__(self, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER, interval=WATCH_INTERVAL):
+        self.matches_folder = matches_folder
+        self.store_folder = store_folder
+        self.interval = interval
+        self.manifest = {}
+        self.entries = {}
+        self.errors = {}
+        self.version = 0
+        self._checked = float("-inf")
+        # Set once the first scan has finished, as there is no catalog before it
+        self._scanned = threading.Event()
+        # (version, catalog) of the last competition_catalog
+        self._competitions = (None, None)
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """Apply the changes since the last scan; returns them, or None when nothing changed.
+
+        Scans at most once per interval. Sessions wait for the first scan,
+        as there is no catalog before it; after that, a session that finds
+        another one updating carries on with the catalog as it was.
+        """
+        scanned = self._scanned.is_set()
+        if scanned and time.monotonic() - self._checked < self.interval:
+            return None
+        if not self._lock.acquire(blocking=not scanned):
+            return None
+        try:
+            # A session that waited for the first scan uses its result
+            if self._scanned.is_set() and time.monotonic() - self._checked < self.interval:
+                return None
+            changes = self._scan()
+            self._scanned.set()
+            return changes
+        finally:
+            self._lock.release()
+
+    def _scan(self):
+        """Rescan Matches/ and apply what changed; poll holds the lock."""
+        self._checked = time.monotonic()
+        manifest = scan_matches(self.matches_folder)
+        changes = diff_manifests(self.manifest, manifest)
+        if not self.manifest and os.path.isdir(self.store_folder):
+            # Only matches whose store file is missing or older than the CSV need work on a first scan
+            changes["added"] = [path for path in changes["added"] if is_stale(path, store_path(path, self.matches_folder, self.store_folder))]
+            self.entries = self._catalog_entries(manifest.keys() - set(changes["added"]), self.errors)
+            self.version += 1
+        if not any(changes.values()):
+            self.manifest = manifest
+            return None
+        self._apply(changes)
+        self.manifest = manifest
+        self.version += 1
+        return changes
+
+    def _catalog_entries(self, paths, errors):
+        """Catalog entries of the paths that can be read; the others go into errors."""
+        entries = {}
+        for path in paths:
+            try:
+                entries[path] = catalog_entry(path)
+            except Exception as exc:
+                errors[path] = f"{type(exc).__name__}: {exc}"
+        return entries
+
+    def _apply(self, changes):
+        updated = changes["added"] + changes["changed"]
+        errors = {path: error for path, error in self.errors.items() if path not in updated and path not in changes["removed"]}
+        if os.path.isdir(self.store_folder):
+            for path in updated:
+                try:
+                    convert_match(path, store_path(path, self.matches_folder, self.store_folder))
+                except Exception as exc:
+                    errors[path] = f"{type(exc).__name__}: {exc}"
+            for path in changes["removed"]:
+                try:
+                    os.remove(store_path(path, self.matches_folder, self.store_folder))
+                except FileNotFoundError:
+                    pass
+            if os.path.exists(os.path.join(self.store_folder, INDEX_NAME)):
+                try:
+                    build_index(self.matches_folder, self.store_folder, PlayerIndex.load(self.matches_folder, self.store_folder))
+                except Exception as exc:
+                    # The old index stays; get_match_players falls back to the match file
+                    errors[os.path.join(self.store_folder, INDEX_NAME)] = f"{type(exc).__name__}: {exc}"
+
+        # Swapped in whole once the store is ready, so readers never see a half-updated catalog
+        entries = {path: entry for path, entry in self.entries.items() if path not in changes["removed"] and path not in updated}
+        entries.update(self._catalog_entries([path for path in updated if path not in errors], errors))
+        self.entries = entries
+        self.errors = errors
+
+    def match_catalog(self):
+        """One entry per match with its competition, name, path and date, oldest first.
+
+        Matches without a date follow, in natural order of their paths.
+        """
+        from natsort import natsorted
+
+        dated = sorted((entry for entry in self.entries.values() if entry["date"] is not None), key=lambda entry: (entry["date"], entry["path"]))
+        undated = natsorted((entry for entry in self.entries.values() if entry["date"] is None), key=lambda entry: entry["path"])
+        return dated + undated
+
+    def competition_catalog(self):
+        """Match names per competition, newest first."""
+        # Entries are swapped in before version is bumped, so a catalog of older entries is never kept for a newer version
+        version = self.version
+        cached_version, competitions = self._competitions
+        if cached_version != version:
+            # Imported on first use rather than with this module
+            from natsort import natsorted
+
+            names = {}
+            for entry in self.entries.values():
+                names.setdefault(entry["competition"], []).append(entry["match"])
+            competitions = {competition: natsorted(matches, reverse=True) for competition, matches in names.items()}
+            self._competitions = (version, competitions)
+        return competitions
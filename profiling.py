@@ -0,0 +1,102 @@
+"""Per-stage timings of each app rerun, with row and artist counters.
+
+Code wraps each pipeline stage in ``with stage(name) as counters`` and may
+set counters such as rows or artists. Stages are recorded for the rerun
+running on the current thread, between start_run() and finish_run(); outside
+a run (the CLIs) they cost two clock reads. Work handed to another thread or
+process runs through run_stages there, and the caller adds the stages it
+returns to its own run with merge_stages. Finished runs
+feed a rolling window per view for p50/p95, and are appended as JSON lines to
+BARCA_PROFILE_LOG when it is set. Settings come from the environment:
+
+    BARCA_PROFILE_LOG      file finished runs are appended to (default: off)
+    BARCA_PROFILE_WINDOW   runs per view kept for percentiles (default 200)
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+PROFILE_LOG = os.environ.get("BARCA_PROFILE_LOG")
+PROFILE_WINDOW = int(os.environ.get("BARCA_PROFILE_WINDOW", 200))
+
+_local = threading.local()
+_history = defaultdict(lambda: deque(maxlen=PROFILE_WINDOW))
+_history_lock = threading.Lock()
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as one stage; yields a dict of counters to fill in."""
+    counters = {}
+    start = time.perf_counter()
+    try:
+        yield counters
+    finally:
+        record_stage(name, time.perf_counter() - start, **counters)
+
+
+def record_stage(name, seconds, **counters):
+    """Add a stage timed by the caller, such as a step summed over a loop, to the run on this thread."""
+    stages = getattr(_local, "stages", None)
+    if stages is not None:
+        stages.append({"stage": name, "ms": round(seconds * 1000, 2), **counters})
+
+
+def start_run():
+    """Begin recording stages for the rerun on this thread."""
+    _local.stages = []
+    _local.start = time.perf_counter()
+
+
+def run_stages(fn, *args):
+    """fn(*args) and the stages it recorded, for calling on another thread or process."""
+    previous = getattr(_local, "stages", None)
+    _local.stages = []
+    try:
+        return fn(*args), _local.stages
+    finally:
+        _local.stages = previous
+
+
+def merge_stages(stages):
+    """Add stages recorded elsewhere to the run on this thread, if one is being recorded."""
+    current = getattr(_local, "stages", None)
+    if current is not None:
+        current.extend(stages)
+
+
+def finish_run(view, **fields):
+    """Stop recording; keep the run's total for ``view`` and return the run."""
+    stages = getattr(_local, "stages", None)
+    if stages is None:
+        return None
+    run = {"time": time.time(), "view": view, "total_ms": round((time.perf_counter() - _local.start) * 1000, 2), **fields, "stages": stages}
+    _local.stages = None
+    with _history_lock:
+        _history[view].append(run)
+    if PROFILE_LOG:
+        with open(PROFILE_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, default=str) + "\n")
+    return run
+
+
+def view_percentiles():
+    """One row per view with its run count and p50/p95 total time over the rolling window."""
+    with _history_lock:
+        totals = {view: [run["total_ms"] for run in runs] for view, runs in _history.items()}
+    return [
+        {"view": view, "runs": len(times), "p50 (ms)": round(float(np.percentile(times, 50)), 1), "p95 (ms)": round(float(np.percentile(times, 95)), 1)}
+        for view, times in sorted(totals.items()) if times
+    ]
+
+
+def recent_runs_jsonl():
+    """Every run in the rolling windows as JSON lines, oldest first."""
+    with _history_lock:
+        runs = sorted((run for runs in _history.values() for run in runs), key=lambda run: run["time"])
+    return "".join(json.dumps(run, default=str) + "\n" for run in runs)
@@ -0,0 +1,194 @@
+"""Pre-render every match x player x view image for the app to serve.
+
+Images are written to <output>/<competition>/<match>/<player>/<view>.<format>
+and listed in <output>/manifest.json with the modification time of the CSV
+they were rendered from and the views.RENDER_SETTINGS they were rendered
+with. Re-running only renders images that are missing, or whose CSV or
+render settings changed; the app serves only images matching both. Run from
+the repository root:
+
+    python render_all.py [--output rendered] [--workers N] [--format png] [--force]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from match_store import MATCHES_FOLDER, STORE_FOLDER, match_key, read_match
+from views import RENDER_SETTINGS, VIEWS, render_image
+
+OUTPUT_FOLDER = "rendered"
+MANIFEST_NAME = "manifest.json"
+
+
+def slugify(text):
+    return re.sub(r"[^\w.-]+", "-", text, flags=re.UNICODE).strip("-").lower()
+
+
+def image_path(match_key, player_name, view, fmt):
+    """Path of an image relative to the output folder."""
+    return os.path.join(os.path.splitext(match_key)[0], slugify(player_name), f"{slugify(view)}.{fmt}")
+
+
+def read_manifest(output_folder=OUTPUT_FOLDER):
+    """Manifest entries keyed by (match, player, view, format)."""
+    try:
+        with open(os.path.join(output_folder, MANIFEST_NAME), encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {(e["match"], e["player"], e["view"], e["format"]): e for e in entries}
+
+
+def write_manifest(entries, output_folder=OUTPUT_FOLDER):
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sorted(entries.values(), key=lambda e: (e["match"], e["player"], e["view"], e["format"])), f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def render_match(match_file_path, jobs, output_folder, fmt, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER):
+    """Render (player, view) jobs for one match; returns their manifest entries.
+
+    A job that fails gets an entry with its error instead of a file.
+    """
+    key = match_key(match_file_path, matches_folder)
+    source_mtime = os.path.getmtime(match_file_path)
+    df = read_match(match_file_path, matches_folder, store_folder)
+
+    entries = []
+    for player_name, view in jobs:
+        entry = {"match": key, "player": player_name, "view": view, "format": fmt, "source_mtime": source_mtime, "render_settings": RENDER_SETTINGS}
+        relative_path = image_path(key, player_name, view, fmt)
+        path = os.path.join(output_folder, relative_path)
+        try:
+            data = render_image(df[df["playerName"] == player_name], player_name, view, fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        except Exception as exc:
+            # One failed image must not discard the rest of the match or stop the run
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+        else:
+            entry["file"] = relative_path.replace(os.sep, "/")
+        entries.append(entry)
+    return entries
+
+
+def is_current(entry, source_mtime):
+    """True when a manifest entry's image was rendered from this CSV version with the current settings."""
+    return entry["source_mtime"] == source_mtime and entry.get("render_settings") == RENDER_SETTINGS
+
+
+def stale_jobs(match_file_path, manifest, output_folder, fmt, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER, force=False):
+    """(player, view) pairs of a match whose image is missing or out of date."""
+    key = match_key(match_file_path, matches_folder)
+    source_mtime = os.path.getmtime(match_file_path)
+    players = read_match(match_file_path, matches_folder, store_folder)["playerName"].dropna().astype(str).unique()
+
+    jobs = []
+    for player_name in sorted(players):
+        for view in VIEWS:
+            entry = manifest.get((key, player_name, view, fmt))
+            # Failed images are tried again on every run
+            if (force or entry is None or not is_current(entry, source_mtime) or "error" in entry
+                    or not os.path.exists(os.path.join(output_folder, entry["file"]))):
+                jobs.append((player_name, view))
+    return jobs
+
+
+def render_all(matches_folder=MATCHES_FOLDER, output_folder=OUTPUT_FOLDER, store_folder=STORE_FOLDER, fmt="png", workers=None, force=False):
+    """Render every stale image in parallel and update the manifest. Returns the (rendered, failed) counts."""
+    os.makedirs(output_folder, exist_ok=True)
+    manifest = read_manifest(output_folder)
+    match_files = sorted(glob.glob(os.path.join(matches_folder, "*", "*.csv")))
+
+    # Forget images of matches that no longer exist
+    present = {match_key(path, matches_folder) for path in match_files}
+    manifest = {k: e for k, e in manifest.items() if e["match"] in present}
+
+    tasks = {}
+    for path in match_files:
+        jobs = stale_jobs(path, manifest, output_folder, fmt, matches_folder, store_folder, force)
+        if jobs:
+            tasks[path] = jobs
+
+    rendered = failed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(render_match, path, jobs, output_folder, fmt, matches_folder, store_folder): path for path, jobs in tasks.items()}
+        for future in as_completed(futures):
+            try:
+                entries = future.result()
+            except Exception as exc:
+                # The match could not be read at all; record every job of it as failed
+                key = match_key(futures[future], matches_folder)
+                entries = [{"match": key, "player": player_name, "view": view, "format": fmt, "source_mtime": os.path.getmtime(futures[future]),
+                            "render_settings": RENDER_SETTINGS, "error": f"{type(exc).__name__}: {exc}"} for player_name, view in tasks[futures[future]]]
+            for entry in entries:
+                manifest[(entry["match"], entry["player"], entry["view"], entry["format"])] = entry
+                if "error" in entry:
+                    failed += 1
+                    print(f"  failed: {entry['match']} / {entry['player']} / {entry['view']}: {entry['error']}")
+                else:
+                    rendered += 1
+            # Save progress after every match so an interrupted run resumes where it stopped
+            write_manifest(manifest, output_folder)
+    write_manifest(manifest, output_folder)
+    return rendered, failed
+
+
+# Manifest as last read by the app, reloaded when the file changes
+_served_manifest = {"mtime": None, "entries": {}}
+_served_manifest_lock = threading.Lock()
+
+
+def prerendered_image(match_file_path, player_name, view, fmt="png", matches_folder=MATCHES_FOLDER, output_folder=OUTPUT_FOLDER):
+    """Bytes of an up to date pre-rendered image, or None."""
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    try:
+        mtime = os.path.getmtime(manifest_path)
+    except FileNotFoundError:
+        return None
+    with _served_manifest_lock:
+        if _served_manifest["mtime"] != mtime:
+            _served_manifest["entries"] = read_manifest(output_folder)
+            _served_manifest["mtime"] = mtime
+        entry = _served_manifest["entries"].get((match_key(match_file_path, matches_folder), player_name, view, fmt))
+
+    if entry is None or "file" not in entry or not is_current(entry, os.path.getmtime(match_file_path)):
+        return None
+    try:
+        with open(os.path.join(output_folder, entry["file"]), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render every match, player and view image.")
+    parser.add_argument("--matches", default=MATCHES_FOLDER, help="folder of <competition>/<match>.csv files")
+    parser.add_argument("--store", default=STORE_FOLDER, help="columnar store to read matches from when up to date")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help="folder the images and manifest are written to")
+    parser.add_argument("--format", default="png", choices=["png", "svg"], help="image format")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render every image, not only stale ones")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rendered, failed = render_all(args.matches, args.output, args.store, args.format, args.workers, args.force)
+    print(f"Rendered {rendered} images in {time.perf_counter() - start:.1f} s" + (f", {failed} failed (listed in the manifest)" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
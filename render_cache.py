@@ -0,0 +1,163 @@
+"""Encoded images of rendered views, reused across reruns and sessions.
+
+Images are keyed by (match file, mtime, player, view, format), with "team"
+in place of the player for team views, and evicted least recently used first
+once their total size passes the byte budget. Images missing from the cache
+are drawn on the bounded render_pool. Settings come from the environment:
+
+    BARCA_RENDER_CACHE_BYTES  byte budget for cached images (default 256 MiB)
+    BARCA_RENDER_FORMAT       "png" (default) or "svg"
+    BARCA_RENDER_MODE         "image" (default) or "interactive", the render
+                              mode the app starts in
+    BARCA_FIGURE_ENTRIES      interactive figures kept in memory (default 256)
+
+Interactive figures are small dicts, so they are kept in an st.cache_data
+cache instead, keyed by (match file, mtime, player). One figure holds every
+interactive view, so switching view only opens the cached figure on it.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from data_cache import CACHE_TTL, file_versions, get_match_events, get_player_events, get_player_type_runs, get_season_events, get_team_network
+from interactive import interactive_figure, open_view
+from profiling import stage
+from render_all import prerendered_image
+from render_pool import render_pool
+from season import season_player_events
+from views import render_image, render_team_image
+
+RENDER_CACHE_BYTES = int(os.environ.get("BARCA_RENDER_CACHE_BYTES", 256 * 1024 * 1024))
+RENDER_FORMAT = os.environ.get("BARCA_RENDER_FORMAT", "png")
+RENDER_MODE = os.environ.get("BARCA_RENDER_MODE", "image")
+FIGURE_ENTRIES = int(os.environ.get("BARCA_FIGURE_ENTRIES", 256))
+
+
+class ByteLRUCache:
+    """Thread-safe LRU mapping of keys to bytes, bounded by total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._items:
+                self.total_bytes -= len(self._items.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._items[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def discard(self, predicate):
+        """Drop every entry whose key matches predicate."""
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                self.total_bytes -= len(self._items.pop(key))
+
+    def stats(self):
+        with self._lock:
+            return {"cache": "render", "entries": len(self._items), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+
+render_cache = ByteLRUCache(RENDER_CACHE_BYTES)
+
+
+def get_view_image(match_file_path, player_name, view, fmt=RENDER_FORMAT):
+    """Encoded image of a view, rendered only if it is not cached yet."""
+    key = (match_file_path, os.path.getmtime(match_file_path), player_name, view, fmt)
+    with stage("render cache lookup") as counters:
+        data = render_cache.get(key)
+        counters["hit"] = data is not None
+    if data is None:
+        # Serve the offline batch output when render_all.py has an up to date copy
+        with stage("prerendered lookup") as counters:
+            data = prerendered_image(match_file_path, player_name, view, fmt)
+            counters["hit"] = data is not None
+        if data is None:
+            data = render_pool.render(key, render_image, get_player_events(match_file_path, player_name), player_name, view, fmt,
+                                      get_player_type_runs(match_file_path, player_name))
+        render_cache.put(key, data)
+    return data
+
+
+def get_team_view_image(match_file_path, view, fmt=RENDER_FORMAT):
+    """Encoded image of a team view of a match, rendered only if it is not cached yet."""
+    mtime = os.path.getmtime(match_file_path)
+    key = (match_file_path, mtime, "team", view, fmt)
+    with stage("render cache lookup") as counters:
+        data = render_cache.get(key)
+        counters["hit"] = data is not None
+    if data is None:
+        data = render_pool.render(key, render_team_image, get_match_events(match_file_path, mtime), get_team_network(match_file_path, mtime), view, fmt)
+        render_cache.put(key, data)
+    return data
+
+
+def get_season_view_image(match_files, player_name, view, fmt=RENDER_FORMAT):
+    """Encoded image of a view over several matches, rendered only if it is not cached yet."""
+    key = ("season", file_versions(match_files), player_name, view, fmt)
+    with stage("render cache lookup") as counters:
+        data = render_cache.get(key)
+        counters["hit"] = data is not None
+    if data is None:
+        events = season_player_events(get_season_events(match_files), player_name)
+        data = render_pool.render(key, render_image, events, player_name, view, fmt)
+        render_cache.put(key, data)
+    return data
+
+
+@st.cache_data(max_entries=FIGURE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _player_figure(match_file_path, mtime, player_name):
+    return interactive_figure(get_player_events(match_file_path, player_name), player_name, type_runs=get_player_type_runs(match_file_path, player_name))
+
+
+@st.cache_data(max_entries=FIGURE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _season_player_figure(versions, player_name):
+    events = season_player_events(get_season_events([path for path, _ in versions]), player_name)
+    return interactive_figure(events, player_name)
+
+
+def get_view_figure(match_file_path, player_name, view):
+    """Interactive figure of a player's action views, opened on ``view``."""
+    return open_view(_player_figure(match_file_path, os.path.getmtime(match_file_path), player_name), view)
+
+
+def get_season_view_figure(match_files, player_name, view):
+    """Interactive figure of a player's action views over several matches, opened on ``view``."""
+    return open_view(_season_player_figure(file_versions(match_files), player_name), view)
+
+
+def show_figure(figure):
+    """Display an interactive figure; its view buttons and legend work without a rerun."""
+    st.plotly_chart(figure, width="stretch", config={"displaylogo": False, "scrollZoom": False})
+
+
+def discard_matches(match_files):
+    """Drop the cached images of these matches, and of season selections including them."""
+    paths = set(match_files)
+    render_cache.discard(lambda key: key[0] in paths or (key[0] == "season" and any(path in paths for path, _ in key[1])))
+
+
+def show_image(data, fmt=RENDER_FORMAT):
+    """Display encoded view bytes the way st.pyplot displays a figure."""
+    st.image(data.decode("utf-8") if fmt == "svg" else data, width="stretch")
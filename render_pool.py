@@ -0,0 +1,127 @@
+"""Bounded pool the app draws and encodes views in.
+
+At most BARCA_RENDER_WORKERS renders run at once and at most
+BARCA_RENDER_QUEUE more wait for a worker. A render that finds the queue
+full waits up to BARCA_RENDER_WAIT seconds for a slot, then is refused with
+RenderBusy, so a burst of sessions cannot pile up threads and figures without
+bound. Sessions asking for the same image while it is being drawn share one
+render. Stages the workers record are added to the profiling run of the
+session that asked for the image. Settings come from the environment:
+
+    BARCA_RENDER_WORKERS  renders drawn at once (default: CPU count, at most 4)
+    BARCA_RENDER_QUEUE    renders waiting for a worker (default 16)
+    BARCA_RENDER_WAIT     seconds to wait for a queue slot (default 5)
+    BARCA_RENDER_POOL     "thread" (default) or "process"; processes draw in
+                          parallel at the cost of a matplotlib per worker
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from profiling import merge_stages, run_stages, stage
+from startup import mark
+
+RENDER_WORKERS = int(os.environ.get("BARCA_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+RENDER_QUEUE = int(os.environ.get("BARCA_RENDER_QUEUE", 16))
+RENDER_WAIT = float(os.environ.get("BARCA_RENDER_WAIT", 5))
+RENDER_POOL = os.environ.get("BARCA_RENDER_POOL", "thread")
+
+
+class RenderBusy(Exception):
+    """Raised when every worker is busy and the render queue is full."""
+
+
+class RenderPool:
+    """Runs render calls on a fixed number of workers behind a bounded queue."""
+
+    def __init__(self, workers=RENDER_WORKERS, queue=RENDER_QUEUE, wait=RENDER_WAIT, kind=RENDER_POOL):
+        self.workers = workers
+        self.queue = queue
+        self.wait = wait
+        self.kind = kind
+        self.submitted = 0
+        self.shared = 0
+        self.rejected = 0
+        self.peak = 0
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        if self.kind == "process":
+            # Spawned, since forking a server process with running threads can deadlock the child
+            return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="render")
+
+    def submit(self, key, fn, *args):
+        """Future of (fn(*args), stages it recorded), shared with any render of ``key`` still running.
+
+        Raises RenderBusy when no queue slot frees up within the wait.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+        # Waited for outside the lock, as finishing renders need it to free their slots
+        if not self._slots.acquire(timeout=self.wait):
+            with self._lock:
+                self.rejected += 1
+            raise RenderBusy(f"{self.workers} renders running and {self.queue} queued")
+
+        with self._lock:
+            # Another session may have started this render while we waited for the slot
+            future = self._pending.get(key)
+            if future is not None:
+                self.shared += 1
+                self._slots.release()
+                return future
+            try:
+                try:
+                    future = self._executor.submit(run_stages, fn, *args)
+                except BrokenProcessPool:
+                    # A worker died; this and later renders get a fresh pool
+                    self._executor = self._new_executor()
+                    future = self._executor.submit(run_stages, fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            self._pending[key] = future
+            self.submitted += 1
+            self.peak = max(self.peak, len(self._pending))
+        future.add_done_callback(lambda done: self._done(key, done))
+        return future
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        self._slots.release()
+
+    def render(self, key, fn, *args):
+        """fn(*args) run on the pool; blocks until it is done."""
+        with stage("render pool") as counters:
+            future = self.submit(key, fn, *args)
+            counters["in flight"] = len(self._pending)
+            result, stages = future.result()
+            # Listed before the enclosing render pool stage, as nested stages are
+            merge_stages(stages)
+        mark("first view rendered")
+        return result
+
+    def worker_pids(self):
+        """Process ids of the workers of a process pool; empty for threads."""
+        if self.kind != "process":
+            return []
+        return list(self._executor._processes or {})
+
+    def stats(self):
+        with self._lock:
+            return {"pool": self.kind, "workers": self.workers, "queue": self.queue, "in flight": len(self._pending), "peak": self.peak,
+                    "submitted": self.submitted, "shared": self.shared, "rejected": self.rejected}
+
+
+render_pool = RenderPool()
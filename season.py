@@ -0,0 +1,77 @@
+"""Player events combined over many matches, for the season view.
+
+load_season reads the matches in parallel into one frame indexed by player,
+so a player's events over the whole selection are one contiguous slice.
+The worker count comes from BARCA_SEASON_WORKERS (default: CPU count, at
+most 8).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from match_data import canonical_name
+from match_store import MATCHES_FOLDER, STORE_FOLDER, match_key, read_match
+
+SEASON_WORKERS = int(os.environ.get("BARCA_SEASON_WORKERS", min(8, os.cpu_count() or 1)))
+
+
+def match_date(match_file_path):
+    """Date of a match, from the timestamp of its first event.
+
+    None when the CSV has no timeStamp column, as some exports lack it, or
+    no readable timestamp.
+    """
+    first = pd.read_csv(match_file_path, nrows=1)
+    if "timeStamp" not in first.columns or first.empty:
+        return None
+    timestamp = pd.to_datetime(first["timeStamp"].iloc[0], errors="coerce")
+    return None if pd.isna(timestamp) else timestamp.date()
+
+
+def catalog_entry(match_file_path):
+    """Competition, name, path and date of a match CSV."""
+    competition = os.path.basename(os.path.dirname(match_file_path))
+    name = os.path.splitext(os.path.basename(match_file_path))[0]
+    return {"competition": competition, "match": name, "path": match_file_path, "date": match_date(match_file_path)}
+
+
+def load_season(match_files, matches_folder=MATCHES_FOLDER, store_folder=STORE_FOLDER, workers=SEASON_WORKERS):
+    """Events of every match in match_files in one frame indexed by playerName.
+
+    Rows are grouped by player, in match_files order within a player, and
+    carry the match they come from. Events without a player are dropped, and
+    spelling variants of a player's name take its most common spelling.
+    """
+    def read(path):
+        return read_match(path, matches_folder, store_folder).assign(match=match_key(path, matches_folder))
+
+    # Parquet and CSV parsing release the GIL, so threads read in parallel
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        df = pd.concat(pool.map(read, match_files), ignore_index=True)
+    df = df[df["playerName"].notna()]
+    counts = df["playerName"].astype(str).value_counts()
+    spelling = {}
+    # value_counts lists the most common spelling of a player first
+    for name in counts.index:
+        spelling.setdefault(canonical_name(name), name)
+    df = df.assign(playerName=df["playerName"].astype(str).map({name: spelling[canonical_name(name)] for name in counts.index}))
+    # Per-match categories differ, so concat falls back to object; re-encode once
+    df = df.astype({"playerId": "category", "playerName": "category", "match": "category"})
+    return df.sort_values("playerName", kind="stable").set_index("playerName")
+
+
+def season_players(season):
+    """Names of the players with events in the season frame, sorted."""
+    return sorted(season.index.unique().astype(str))
+
+
+def season_player_events(season, player_name):
+    """One player's events over the season, as a slice of the sorted frame."""
+    if player_name not in season.index:
+        return season.iloc[:0]
+    rows = season.index.get_loc(player_name)
+    # A player with a single event gets a position instead of a slice
+    if isinstance(rows, int):
+        rows = slice(rows, rows + 1)
+    return season.iloc[rows]
@@ -0,0 +1,38 @@
+"""Startup timeline of the app process, shown when the app is opened with ?profile=1.
+
+mark() records how long after this module's import a step first happened;
+later calls with the same label are ignored, so the timeline shows the cold
+start and first render of the process, not every rerun.
+"""
+import sys
+import threading
+import time
+
+# Libraries the app defers until they are needed
+HEAVY_MODULES = ["pandas", "pyarrow", "natsort", "matplotlib", "mplsoccer", "scipy", "seaborn", "plotly"]
+
+_start = time.perf_counter()
+_marks = {}
+_marks_lock = threading.Lock()
+
+
+def mark(label):
+    """Record the first time ``label`` happens."""
+    with _marks_lock:
+        _marks.setdefault(label, time.perf_counter() - _start)
+
+
+def timeline():
+    """One row per step, in order, with its time since startup and since the step before."""
+    with _marks_lock:
+        marks = sorted(_marks.items(), key=lambda item: item[1])
+    rows, previous = [], 0.0
+    for label, seconds in marks:
+        rows.append({"step": label, "at (ms)": round(seconds * 1000, 1), "took (ms)": round((seconds - previous) * 1000, 1)})
+        previous = seconds
+    return rows
+
+
+def loaded_modules():
+    """Which of HEAVY_MODULES this process has imported so far."""
+    return [{"module": name, "loaded": name in sys.modules} for name in HEAVY_MODULES]
@@ -1,12 +1,17 @@
+from startup import loaded_modules, mark, timeline
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-import glob
 import os
-from mplsoccer import Pitch, VerticalPitch
-from scipy.spatial import ConvexHull
-from natsort import natsorted
+from profiling import finish_run, recent_runs_jsonl, start_run, view_percentiles
+from data_cache import cache_stats, get_competition_catalog, get_match_catalog, get_match_errors, get_match_players, get_player_index, get_season_events, poll_matches
+from interactive import INTERACTIVE_VIEWS
+from render_cache import RENDER_MODE, discard_matches, get_season_view_figure, get_season_view_image, get_team_view_image, get_view_figure, get_view_image, render_cache, show_figure, show_image
+from match_store import match_key
+from render_pool import RenderBusy, render_pool
+from season import season_players
+from views import TEAM_VIEWS, VIEWS
+
+mark("app modules imported")
+start_run()
 
 if "action_filter" not in st.session_state:
     st.session_state.action_filter = "All Actions"  # Set a default value
@@ -18,449 +23,171 @@ st.subheader("Visualizing the Actions, Passes and Heat Map of all Barça players
 # Define the root folder containing competitions
 matches_folder = "Matches"
 
-# Step 1: Get all competition names (sub-folders)
-competitions = [folder for folder in os.listdir(matches_folder) if os.path.isdir(os.path.join(matches_folder, folder))]
+# Pick up match CSVs added, changed or removed since the last scan; only their cached images are dropped
+changes = poll_matches(matches_folder)
+if changes:
+    discard_matches(changes["changed"] + changes["removed"])
+for path, error in get_match_errors(matches_folder).items():
+    st.sidebar.warning(f"Skipped {os.path.relpath(path, matches_folder)}: {error}")
+
+
+def select_view(team_views=False):
+    """Show the action bar, with the team views when asked, and return the view picked last."""
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    if col1.button("ALL ACTIONS IN THE MATCH"):
+        st.session_state.action_filter = "ALL ACTIONS IN THE MATCH"
+    if col2.button("PASSES AND HEATMAP"):
+        st.session_state.action_filter = "PASSES AND HEATMAP"
+    if col3.button("OFFENSIVE ACTIONS"):
+        st.session_state.action_filter = "OFFENSIVE ACTIONS"
+    if col4.button("DEFENSIVE ACTIONS"):
+        st.session_state.action_filter = "DEFENSIVE ACTIONS"
+    if col5.button("CONVEX HULL"):
+        st.session_state.action_filter = "CONVEX HULL"
+
+    if team_views:
+        team_col1, team_col2 = st.columns(2)
+        if team_col1.button("PASS NETWORK"):
+            st.session_state.action_filter = "PASS NETWORK"
+        if team_col2.button("TEAM SHAPE"):
+            st.session_state.action_filter = "TEAM SHAPE"
+
+    return st.session_state.action_filter
+
+
+def show_rendered(get_image, *args):
+    """Show a rendered view, or a notice when the render queue is full."""
+    try:
+        show_image(get_image(*args))
+    except RenderBusy:
+        st.warning("The server is busy drawing views for other users. Please try again in a moment.")
+
+
+def show_diagnostics():
+    # Cache hit/miss counters, shown when the app is opened with ?debug=1
+    if st.query_params.get("debug"):
+        with st.expander("Debug: caches"):
+            st.table(cache_stats())
+            st.table([render_cache.stats()])
+            st.table([render_pool.stats()])
+    # Cold start timeline of this server process, shown with ?profile=1
+    if st.query_params.get("profile"):
+        mark("first page shown")
+        with st.expander("Profile: startup", expanded=True):
+            st.table(timeline())
+            st.table(loaded_modules())
+
+    # Stage breakdown of this rerun and rolling percentiles per view, in the sidebar when switched on
+    run = finish_run(st.session_state.action_filter, mode=mode, render_mode=render_mode)
+    if st.sidebar.toggle("Profiling panel"):
+        st.sidebar.write(f"**This rerun:** {run['total_ms']:.0f} ms")
+        st.sidebar.dataframe(run["stages"], hide_index=True)
+        st.sidebar.write("**Per view, rolling window**")
+        st.sidebar.dataframe(view_percentiles(), hide_index=True)
+        st.sidebar.download_button("Export runs (JSON lines)", recent_runs_jsonl(), file_name="profile.jsonl", mime="application/x-ndjson")
+
+
+mode = st.radio("Mode -", ["Single Match", "Season Aggregate"], horizontal=True)
+# Interactive figures are drawn by the browser, which also switches between the action views
+render_mode = st.sidebar.radio("Render mode", ["Image", "Interactive"], index=int(RENDER_MODE == "interactive"))
+
+if mode == "Season Aggregate":
+    # One player's actions combined over every match of the chosen competitions and dates
+    season_catalog = get_match_catalog(matches_folder)
+    if not season_catalog:
+        st.warning("No match files found in the 'Matches' folder.")
+        st.stop()
+
+    all_competitions = sorted({entry["competition"] for entry in season_catalog})
+    selected_competitions = st.multiselect("Select Competitions -", all_competitions, default=all_competitions)
+    dates = sorted(entry["date"] for entry in season_catalog if entry["date"] is not None)
+    if dates:
+        first_date, last_date = dates[0], dates[-1]
+        date_range = st.date_input("Select Dates -", (first_date, last_date), min_value=first_date, max_value=last_date)
+        # The picker returns a single date while the range is being chosen
+        if len(date_range) != 2:
+            date_range = (first_date, last_date)
+    else:
+        date_range = (None, None)
+    # Matches whose CSV carries no timestamp cannot be placed in a range, so they only count when no dates are excluded
+    whole_season = dates == [] or tuple(date_range) == (dates[0], dates[-1])
+    if len(dates) < len(season_catalog):
+        st.caption(f"{len(season_catalog) - len(dates)} matches have no date and are included only when the whole date range is selected.")
+
+    season_files = [entry["path"] for entry in season_catalog
+                    if entry["competition"] in selected_competitions
+                    and (whole_season if entry["date"] is None else date_range[0] <= entry["date"] <= date_range[1])]
+    if not season_files:
+        st.warning("No matches in the selected competitions and dates.")
+        st.stop()
+
+    season = get_season_events(season_files)
+    selected_player = st.selectbox("Select Player -", season_players(season))
+
+    st.write(f"**Selected Competitions:** {', '.join(selected_competitions)}")
+    st.write(f"**Matches:** {len(season_files)}" + (f" ({date_range[0]:%d %b %Y} - {date_range[1]:%d %b %Y})" if dates else ""))
+    st.write(f"**Selected Player:** {selected_player}")
+    index = get_player_index()
+    if index is not None and all(index.covers(path) for path in season_files):
+        season_keys = {match_key(path, matches_folder) for path in season_files}
+        played = [key for key in index.matches_of(selected_player) if key in season_keys]
+        st.write(f"**Matches Played:** {len(played)} of {len(season_files)}")
+
+    action_filter = select_view()
+    if render_mode == "Interactive" and action_filter in INTERACTIVE_VIEWS and selected_player:
+        show_figure(get_season_view_figure(season_files, selected_player, action_filter))
+    elif action_filter in VIEWS and selected_player:
+        show_rendered(get_season_view_image, season_files, selected_player, action_filter)
+
+    show_diagnostics()
+    st.stop()
+
+# Step 1: Get all competition names (sub-folders), listed again only when a folder changes
+catalog = get_competition_catalog(matches_folder)
+competitions = list(catalog)
+mark("competitions listed")
 
 if competitions:
     selected_competition = st.selectbox("Select Competition -", sorted(competitions))
 
-    # Step 2: Get match files from the selected competition folder
+    # Step 2: Get match names of the selected competition, naturally sorted, newest first
     competition_path = os.path.join(matches_folder, selected_competition)
-    match_files = glob.glob(os.path.join(competition_path, "*.csv"))  # List all CSV files
+    match_names = catalog[selected_competition]
 
-    if match_files:
-        # Extract match names from filenames
-        match_names = [os.path.basename(file).replace(".csv", "") for file in match_files]
-        match_names = natsorted(match_names, reverse=True)  # Sort naturally
-        
+    if match_names:
         # Step 3: Select a match
         selected_match = st.selectbox("Select A Match - ", match_names)
         
         # Step 4: Read the selected match file
         match_file_path = os.path.join(competition_path, f"{selected_match}.csv")
-        df = pd.read_csv(match_file_path)
-        df = df[df["teamName"] == "Barcelona"]
-
-        # Extract end_x, end_y from qualifiers
-        qualifier_id_cols = [col for col in df.columns if "/qualifierId" in col]
-        qualifier_value_cols = [col.replace("/qualifierId", "/value") for col in qualifier_id_cols]
-
-        df['end_x'] = np.nan
-        df['end_y'] = np.nan
+        # Barcelona's players in the match, looked up in the store's player index when it covers the match
+        player_options = get_match_players(match_file_path)
+        mark("first match loaded")
 
-        for id_col, value_col in zip(qualifier_id_cols, qualifier_value_cols):
-            df['end_x'] = df.apply(lambda row: row[value_col] if row[id_col] == 140 else row['end_x'], axis=1)
-            df['end_y'] = df.apply(lambda row: row[value_col] if row[id_col] == 141 else row['end_y'], axis=1)
-
-        # Check if "playerName" column exists
-        if "playerName" in df.columns:
+        if player_options:
             # Step 5: Select a player from the match
-            player_options = df["playerName"].dropna().astype(str).unique()
-            selected_player = st.selectbox("Select Player -", sorted(player_options))
+            selected_player = st.selectbox("Select Player -", player_options)
 
             # Display selected values
             st.write(f"**Selected Competition:** {selected_competition}")
             st.write(f"**Selected Match:** {selected_match}")
             st.write(f"**Selected Player:** {selected_player}")
 
-            # Function to filter data
-            filtered_data = df[df['playerName'] == selected_player]
-
-            action_filters = ["All Actions", "Heat Map & Passes", "Offensive Actions", "Defensive Actions", "Convex Hull"]
-            col1, col2, col3, col4, col5 = st.columns(5)
-
-            if col1.button("ALL ACTIONS IN THE MATCH"):
-                st.session_state.action_filter = "ALL ACTIONS IN THE MATCH"
-            if col2.button("PASSES AND HEATMAP"):
-                st.session_state.action_filter = "PASSES AND HEATMAP"
-            if col3.button("OFFENSIVE ACTIONS"):
-                st.session_state.action_filter = "OFFENSIVE ACTIONS"
-            if col4.button("DEFENSIVE ACTIONS"):
-                st.session_state.action_filter = "DEFENSIVE ACTIONS"
-            if col5.button("CONVEX HULL"):
-                st.session_state.action_filter = "CONVEX HULL"
-
-            # Create Pitch
-            pitch = VerticalPitch(pitch_type='opta', pitch_color='black', line_color='white', linewidth=3, corner_arcs=True)
-            fig, ax = pitch.draw(figsize=(10, 10), constrained_layout=True, tight_layout=False)
-            fig.set_facecolor('black')
-
-            action_filter = st.session_state.action_filter
-
-            if action_filter == "ALL ACTIONS IN THE MATCH":
-                goal = filtered_data[filtered_data['typeId'] == 16]
-
-                qualifier_columns = [col for col in goal.columns if col.startswith('qualifier/') and col.endswith('/value')]
-
-                if qualifier_columns:
-                    own_goal = goal[goal[qualifier_columns].apply(lambda row: 'OWN_GOAL' in row.values, axis=1)]
-                else:
-                    own_goal = pd.DataFrame()
-
-                # Ensure x and y exist to prevent KeyError
-                if own_goal.empty or 'x' not in own_goal.columns or 'y' not in own_goal.columns:
-                    own_goal = pd.DataFrame({'x': [], 'y': []})  # Empty DataFrame to prevent errors
-                    
-                shot_miss = filtered_data[filtered_data['typeId'] == 13]
-                shot_post = filtered_data[filtered_data['typeId'] == 14]
-                shot_saved = filtered_data[filtered_data['typeId'] == 15]
-                
-                assist = filtered_data[filtered_data['assist'] == 1]
-                chance = filtered_data[filtered_data['keyPass'] == 1]
-                passes = filtered_data[filtered_data['typeId'] == 1]
-                passes_successful = passes[(passes['outcome'] == 1) & ~(passes['eventId'].isin(chance['eventId']))]
-                passes_unsuccessful = passes[passes['outcome'] == 0]
-                
-                recovery = filtered_data[filtered_data['typeId'] == 49]
-                offside = filtered_data[filtered_data['typeId'] == 55]
-                shield = filtered_data[filtered_data['typeId'] == 56]
-                
-                tackle = filtered_data[filtered_data['typeId'] == 7]
-                succ_tackle = tackle[tackle['outcome'] == 1]
-                
-                interception = filtered_data[filtered_data['typeId'] == 8]
-                block = filtered_data[filtered_data['typeId'] == 10]
-                clearance = filtered_data[filtered_data['typeId'] == 12]
-                
-                foul = filtered_data[filtered_data['typeId'] == 4]
-                foul_won = foul[foul['outcome'] == 1]
-                foul_committed = foul[foul['outcome'] == 0]
-                
-                dribble = filtered_data[filtered_data['typeId'] == 3]
-                succ_dribble = dribble[dribble['outcome'] == 1]
-                
-                aerial = filtered_data[filtered_data['typeId'] == 44]
-                aerial_won = aerial[aerial['outcome'] == 1]
-                aerial_lost = aerial[aerial['outcome'] == 0]
-
-                dispossessed = filtered_data[filtered_data['typeId'] == 50]
-
-                dribbled_past = filtered_data[filtered_data['typeId'] == 45]
-                
-                pickup = filtered_data[filtered_data['typeId'] == 52]
-                punch = filtered_data[filtered_data['typeId'] == 41]
-
-                for df_subset in [assist, chance, passes, passes_successful, passes_unsuccessful]:
-                    df_subset[['x', 'y', 'end_x', 'end_y']] = df_subset[['x', 'y', 'end_x', 'end_y']].astype(float)
-
-                if selected_player in ["Wojciech Szczesny", "Wojciech Szczęsny", "Inaki Pena", "Iñaki Peña", "Marc-Andre ter Stegen"]:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    pitch.arrows(passes_successful.x, passes_successful.y, passes_successful.end_x, passes_successful.end_y, width=0.75, color='#00ff00', ax=ax, label='Completed Pass')
-                    pitch.arrows(passes_unsuccessful.x, passes_unsuccessful.y, passes_unsuccessful.end_x, passes_unsuccessful.end_y, width=0.75, color='red', ax=ax, label='Incomplete Pass')
-                    plt.scatter(block['y'], block['x'], s = 200, c = '#00ff00', marker = '*', edgecolor = '#000000', label ='Save')
-                    plt.scatter(punch['y'], punch['x'], s = 100, c = '#ffec00', marker = 'o', edgecolor = '#000000', label = 'Punch')
-                    plt.scatter(pickup['y'], pickup['x'], s = 120, c = '#dd571c', marker = '+', edgecolor = '#000000', label = 'Pick-Up')
-                    plt.scatter(succ_dribble['y'], succ_dribble['x'], s= 200, c = '#009afd', marker = '*', edgecolor = '#000000', label = 'Dribble') #fc3900
-                    plt.scatter(tackle['y'], tackle['x'], s= 130,c = '#bebebe', marker = 'H', edgecolor = '#000000', label = 'Tackle')
-                    plt.scatter(recovery['y'], recovery['x'], s= 130, c = '#fcd200', marker = 'H', edgecolor = '#000000', label = 'Ball Recovery')
-                    plt.scatter(interception['y'], interception['x'], s = 130, c = '#ff007f', marker = 'H', edgecolor = '#000000', label = 'Interception')
-                    plt.scatter(clearance['y'], clearance['x'], s = 100, c = '#9999ff', marker = 'x', edgecolor = '#000000', label = 'Clearance')
-                    plt.scatter(offside['y'], offside['x'], s= 120, c = '#fcd200', marker = 'P', edgecolor = '#000000', label = 'Offside Provoked')
-                    plt.scatter(shield['y'], shield['x'], s = 50, c = '#dd571c', marker = 'D', edgecolor = '#000000', label = 'Shielding Ball Out')
-                    plt.scatter(succ_dribble['y'], succ_dribble['x'], s= 200, c = '#fc3900', marker = '*', edgecolor = '#000000', label = 'Dribble')
-                    plt.scatter(foul_won['y'], foul_won['x'], s= 120, c = '#008000', marker = 'X', edgecolor = '#000000', label = 'Foul Won')
-                    plt.scatter(foul_committed['y'], foul_committed['x'], s= 120, c = '#c21919', marker = 'X', edgecolor = '#000000', label = 'Foul Committed')
-                    plt.scatter(dispossessed['y'], dispossessed['x'], s = 100, c = '#cb0000', marker = 'p', edgecolor = '#000000', label = 'Dispossessed')
-                    plt.scatter(dribbled_past['y'], dribbled_past['x'], s = 50, c = '#cb0000', marker = 'x', edgecolor = '#000000', label = 'Dribbled Past')
-                    plt.scatter(own_goal['x'], own_goal['y'], s=120, c='red', edgecolor='orange', label='Own Goal')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(-0.19, 1.12), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-   
-                    if selected_player or selected_team:
-                        st.pyplot(fig)
-                        plt.close(fig)
-
-                else:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-
-                    pitch.scatter(goal['x'], goal['y'], s=120, c='#00ff00', edgecolors='#06402b', label='Goal', marker = 'football', ax=ax)
-                    pitch.scatter(shot_saved['x'], shot_saved['y'], s=120, c='#ff7c60', edgecolors='#000000', label='Saved/Blocked Shot', marker = 'football', ax=ax)
-                    pitch.scatter(shot_post['x'], shot_post['y'], s=120, c='w', edgecolors='#000000', label='Shot Off Woodwork', marker = 'football', ax=ax)
-                    pitch.scatter(shot_miss['x'], shot_miss['y'], s=120, c='r', edgecolors='#000000', label='Shot Off Target', marker = 'football', ax=ax)
-
-                    pitch.lines(assist.x, assist.y, assist.end_x, assist.end_y, color='#00ff00', comet = True, lw = 2.5, ax=ax, label='Assist')
-                    ax.scatter(assist['end_y'], assist['end_x'], s=50, c='black', edgecolor='#00ff00')
-
-                    pitch.lines(chance.x, chance.y, chance.end_x, chance.end_y, color='#ffea00', comet = True, lw = 2.5, ax=ax, label='Key Pass')
-                    ax.scatter(chance['end_y'], chance['end_x'], s=50, c='black', edgecolor='#ffea00')
-
-                    pitch.arrows(passes_successful.x, passes_successful.y, passes_successful.end_x, passes_successful.end_y, width=0.6, headwidth=5, headlength=5, color='#00ff00', ax=ax, label='Completed Pass')
-                    pitch.arrows(passes_unsuccessful.x, passes_unsuccessful.y, passes_unsuccessful.end_x, passes_unsuccessful.end_y, width=0.6, headwidth=5, headlength=5, color='red', ax=ax, label='Incomplete Pass')
-
-                    plt.scatter(succ_dribble['y'], succ_dribble['x'], s= 200, c = '#009afd', marker = '*', edgecolor = '#000000', label = 'Dribble') #fc3900
-                    plt.scatter(tackle['y'], tackle['x'], s= 130,c = '#bebebe', marker = 'H', edgecolor = '#000000', label = 'Tackle')
-                    plt.scatter(recovery['y'], recovery['x'], s= 130, c = '#fcd200', marker = 'H', edgecolor = '#000000', label = 'Ball Recovery')
-                    plt.scatter(block['y'], block['x'], s = 130, c = 'cyan', marker = 'H', edgecolor = '#000000', label ='Block') #009afd
-                    plt.scatter(interception['y'], interception['x'], s = 130, c = '#ff007f', marker = 'H', edgecolor = '#000000', label = 'Interception')
-                    plt.scatter(clearance['y'], clearance['x'], s = 100, c = '#9999ff', marker = 'x', edgecolor = '#000000', label = 'Clearance')
-                    plt.scatter(offside['y'], offside['x'], s= 120, c = '#fcd200', marker = 'P', edgecolor = '#000000', label = 'Offside Provoked')
-                    plt.scatter(shield['y'], shield['x'], s = 50, c = '#dd571c', marker = 'D', edgecolor = '#000000', label = 'Shielding Ball Out')
-                    plt.scatter(foul_won['y'], foul_won['x'], s= 120, c = '#008000', marker = 'X', edgecolor = '#000000', label = 'Foul Won')
-                    plt.scatter(foul_committed['y'], foul_committed['x'], s= 120, c = '#c21919', marker = 'X', edgecolor = '#000000', label = 'Foul Committed')
-                    plt.scatter(aerial_won['y'], aerial_won['x'], s = 100, c = '#008000', marker = '^', edgecolor = '#000000', label = 'Aerial Won')
-                    plt.scatter(aerial_lost['y'], aerial_lost['x'], s = 100, c = '#c21919', marker = '^', edgecolor = '#000000', label = 'Aerial Lost')
-                    plt.scatter(dispossessed['y'], dispossessed['x'], s = 100, c = '#cb0000', marker = 'p', edgecolor = '#000000', label = 'Dispossessed')
-                    plt.scatter(dribbled_past['y'], dribbled_past['x'], s = 50, c = '#cb0000', marker = 'x', edgecolor = '#000000', label = 'Dribbled Past')
-                    plt.scatter(own_goal['x'], own_goal['y'], s=120, c='red', edgecolor='orange', label='Own Goal')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(-0.23, 1.17), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-                
-                    if selected_player or selected_team:
-                        st.pyplot(fig)
-                        plt.close(fig)
-
-            if action_filter == "PASSES AND HEATMAP":
-                passes = filtered_data[filtered_data['typeId'] == 1]
-                passes_successful = passes[passes['outcome'] == 1]
-                passes_unsuccessful = passes[passes['outcome'] == 0]
-                assist = filtered_data[filtered_data['assist'] == 1]
-                chance = filtered_data[filtered_data['keyPass'] == 1]
-
-                for df_subset in [assist, chance, passes, passes_successful, passes_unsuccessful]:
-                    df_subset[['x', 'y', 'end_x', 'end_y']] = df_subset[['x', 'y', 'end_x', 'end_y']].astype(float)
-
-                if selected_player in ["Wojciech Szczesny", "Wojciech Szczęsny", "Inaki Pena", "Iñaki Peña", "Marc-Andre ter Stegen"]:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    pitch.arrows(passes_successful.x, passes_successful.y, passes_successful.end_x, passes_successful.end_y, width=0.75, color='#00ff00', ax=ax, label='Completed Pass')
-                    pitch.arrows(passes_unsuccessful.x, passes_unsuccessful.y, passes_unsuccessful.end_x, passes_unsuccessful.end_y, width=0.75, color='red', ax=ax, label='Incomplete Pass')
-
-                    pitch.lines(assist.x, assist.y, assist.end_x, assist.end_y, color='#00ff00', comet = True, lw = 2.5, ax=ax, label='Assist')
-                    ax.scatter(assist['end_y'], assist['end_x'], s=50, c='black', edgecolor='#00ff00')
-
-                    pitch.lines(chance.x, chance.y, chance.end_x, chance.end_y, color='#ffea00', comet = True, lw = 2.5, ax=ax, label='Key Pass')
-                    ax.scatter(chance['end_y'], chance['end_x'], s=50, c='black', edgecolor='#ffea00')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(0.205, 1.06), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=2, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-                    st.pyplot(fig)
-
-                else:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    pitch.arrows(passes_successful.x, passes_successful.y, passes_successful.end_x, passes_successful.end_y, width=0.6, headwidth=5, headlength=5, color='#00ff00', ax=ax, label='Completed Pass')
-                    pitch.arrows(passes_unsuccessful.x, passes_unsuccessful.y, passes_unsuccessful.end_x, passes_unsuccessful.end_y, width=0.6, headwidth=5, headlength=5, color='red', ax=ax, label='Incomplete Pass')
-
-                    pitch.lines(assist.x, assist.y, assist.end_x, assist.end_y, color='#00ff00', comet = True, lw = 2.5, ax=ax, label='Assist')
-                    ax.scatter(assist['end_y'], assist['end_x'], s=50, c='black', edgecolor='#00ff00')
-
-                    pitch.lines(chance.x, chance.y, chance.end_x, chance.end_y, color='#ffea00', comet = True, lw = 2.5, ax=ax, label='Key Pass')
-                    ax.scatter(chance['end_y'], chance['end_x'], s=50, c='black', edgecolor='#ffea00')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(0.205, 1.06), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=2, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-                    st.pyplot(fig)
-
-            if action_filter == "OFFENSIVE ACTIONS":
-                goal = filtered_data[filtered_data['typeId'] == 16]
-                shot_miss = filtered_data[filtered_data['typeId'] == 13]
-                shot_post = filtered_data[filtered_data['typeId'] == 14]
-                shot_saved = filtered_data[filtered_data['typeId'] == 15]
-                
-                assist = filtered_data[filtered_data['assist'] == 1]
-                chance = filtered_data[filtered_data['keyPass'] == 1]
-                passes = filtered_data[filtered_data['typeId'] == 1]
-
-                dribble = filtered_data[filtered_data['typeId'] == 3]
-                succ_dribble = dribble[dribble['outcome'] == 1]
-
-                foul = filtered_data[filtered_data['typeId'] == 4]
-                foul_won = foul[foul['outcome'] == 1]
-                foul_committed = foul[foul['outcome'] == 0]
-                    
-                aerial = filtered_data[filtered_data['typeId'] == 44]
-                aerial_won = aerial[aerial['outcome'] == 1]
-                aerial_lost = aerial[aerial['outcome'] == 0]
-
-                dispossessed = filtered_data[filtered_data['typeId'] == 50]
-
-                for df_subset in [assist, chance, dribble, succ_dribble]:
-                    df_subset[['x', 'y', 'end_x', 'end_y']] = df_subset[['x', 'y', 'end_x', 'end_y']].astype(float)
-
-                if selected_player in ["Wojciech Szczesny", "Wojciech Szczęsny", "Inaki Pena", "Iñaki Peña", "Marc-Andre ter Stegen"]:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    pitch.scatter(goal['x'], goal['y'], s=120, c='#00ff00', edgecolors='#06402b', label='Goal', marker = 'football', ax=ax)
-                    pitch.scatter(shot_saved['x'], shot_saved['y'], s=120, c='#ff7c60', edgecolors='#000000', label='Saved/Blocked Shot', marker = 'football', ax=ax)
-                    pitch.scatter(shot_post['x'], shot_post['y'], s=120, c='w', edgecolors='#000000', label='Shot Off Woodwork', marker = 'football', ax=ax)
-                    pitch.scatter(shot_miss['x'], shot_miss['y'], s=120, c='r', edgecolors='#000000', label='Shot Off Target', marker = 'football', ax=ax)
-
-                    pitch.lines(assist.x, assist.y, assist.end_x, assist.end_y, color='#00ff00', comet = True, lw = 2.5, ax=ax, label='Assist')
-                    ax.scatter(assist['end_y'], assist['end_x'], s=50, c='black', edgecolor='#00ff00')
-
-                    pitch.lines(chance.x, chance.y, chance.end_x, chance.end_y, color='#ffea00', comet = True, lw = 2.5, ax=ax, label='Key Pass')
-                    ax.scatter(chance['end_y'], chance['end_x'], s=50, c='black', edgecolor='#ffea00')
-
-                    plt.scatter(succ_dribble['y'], succ_dribble['x'], s= 200, c = '#009afd', marker = '*', edgecolor = '#000000', label = 'Dribble')
-
-                    plt.scatter(foul_won['y'], foul_won['x'], s= 120, c = '#008000', marker = 'X', edgecolor = '#000000', label = 'Foul Won')
-                    plt.scatter(foul_committed['y'], foul_committed['x'], s= 120, c = '#c21919', marker = 'X', edgecolor = '#000000', label = 'Foul Committed')
-                    plt.scatter(aerial_won['y'], aerial_won['x'], s = 100, c = '#008000', marker = '^', edgecolor = '#000000', label = 'Aerial Won')
-                    plt.scatter(aerial_lost['y'], aerial_lost['x'], s = 100, c = '#c21919', marker = '^', edgecolor = '#000000', label = 'Aerial Lost')
-                    plt.scatter(dispossessed['y'], dispossessed['x'], s = 100, c = '#cb0000', marker = 'p', edgecolor = '#000000', label = 'Dispossessed')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(-0.2, 1.09), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-
-                    if selected_player or selected_team:
-                        st.pyplot(fig)
-
-                else:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    pitch.scatter(goal['x'], goal['y'], s=120, c='#00ff00', edgecolors='#06402b', label='Goal', marker = 'football', ax=ax)
-                    pitch.scatter(shot_saved['x'], shot_saved['y'], s=120, c='#ff7c60', edgecolors='#000000', label='Saved/Blocked Shot', marker = 'football', ax=ax)
-                    pitch.scatter(shot_post['x'], shot_post['y'], s=120, c='w', edgecolors='#000000', label='Shot Off Woodwork', marker = 'football', ax=ax)
-                    pitch.scatter(shot_miss['x'], shot_miss['y'], s=120, c='r', edgecolors='#000000', label='Shot Off Target', marker = 'football', ax=ax)
-
-                    pitch.lines(assist.x, assist.y, assist.end_x, assist.end_y, color='#00ff00', comet = True, lw = 2.5, ax=ax, label='Assist')
-                    ax.scatter(assist['end_y'], assist['end_x'], s=50, c='black', edgecolor='#00ff00')
-
-                    pitch.lines(chance.x, chance.y, chance.end_x, chance.end_y, color='#ffea00', comet = True, lw = 2.5, ax=ax, label='Key Pass')
-                    ax.scatter(chance['end_y'], chance['end_x'], s=50, c='black', edgecolor='#ffea00')
-
-                    plt.scatter(succ_dribble['y'], succ_dribble['x'], s= 200, c = '#009afd', marker = '*', edgecolor = '#000000', label = 'Dribble')
-                    plt.scatter(foul_won['y'], foul_won['x'], s= 120, c = '#008000', marker = 'X', edgecolor = '#000000', label = 'Foul Won')
-                    plt.scatter(foul_committed['y'], foul_committed['x'], s= 120, c = '#c21919', marker = 'X', edgecolor = '#000000', label = 'Foul Committed')
-                    plt.scatter(aerial_won['y'], aerial_won['x'], s = 100, c = '#008000', marker = '^', edgecolor = '#000000', label = 'Aerial Won')
-                    plt.scatter(aerial_lost['y'], aerial_lost['x'], s = 100, c = '#c21919', marker = '^', edgecolor = '#000000', label = 'Aerial Lost')
-                    plt.scatter(dispossessed['y'], dispossessed['x'], s = 100, c = '#cb0000', marker = 'p', edgecolor = '#000000', label = 'Dispossessed')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(-0.2, 1.09), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-
-                    if selected_player or selected_team:
-                        st.pyplot(fig)                  
-                    
-            if action_filter == "DEFENSIVE ACTIONS":
-                goal = filtered_data[filtered_data['typeId'] == 16]
-                passes = filtered_data[filtered_data['typeId'] == 1]
-
-                if qualifier_columns:
-                    own_goal = goal[goal[qualifier_columns].apply(lambda row: 'OWN_GOAL' in row.values, axis=1)]
-                else:
-                    own_goal = pd.DataFrame()
-
-                # Ensure x and y exist to prevent KeyError
-                if own_goal.empty or 'x' not in own_goal.columns or 'y' not in own_goal.columns:
-                    own_goal = pd.DataFrame({'x': [], 'y': []})  # Empty DataFrame to prevent errors
-                    
-                recovery = filtered_data[filtered_data['typeId'] == 49]
-                offside = filtered_data[filtered_data['typeId'] == 55]
-                shield = filtered_data[filtered_data['typeId'] == 56]
-                
-                tackle = filtered_data[filtered_data['typeId'] == 7]
-                succ_tackle = tackle[tackle['outcome'] == 1]
-                    
-                interception = filtered_data[filtered_data['typeId'] == 8]
-                block = filtered_data[filtered_data['typeId'] == 10]
-                clearance = filtered_data[filtered_data['typeId'] == 12]
-                    
-                foul = filtered_data[filtered_data['typeId'] == 4]
-                foul_won = foul[foul['outcome'] == 1]
-                foul_committed = foul[foul['outcome'] == 0]
-                    
-                aerial = filtered_data[filtered_data['typeId'] == 44]
-                aerial_won = aerial[aerial['outcome'] == 1]
-                aerial_lost = aerial[aerial['outcome'] == 0]
-
-                dispossessed = filtered_data[filtered_data['typeId'] == 50]
-
-                dribbled_past = filtered_data[filtered_data['typeId'] == 45]
-                
-                pickup = filtered_data[filtered_data['typeId'] == 52]
-                punch = filtered_data[filtered_data['typeId'] == 41]
-
-                for df_subset in [passes]:
-                    df_subset[['x', 'y', 'end_x', 'end_y']] = df_subset[['x', 'y', 'end_x', 'end_y']].astype(float)
-
-                if selected_player in ["Wojciech Szczesny", "Wojciech Szczęsny", "Inaki Pena", "Iñaki Peña", "Marc-Andre ter Stegen"]:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    plt.scatter(block['y'], block['x'], s = 200, c = '#00ff00', marker = '*', edgecolor = '#000000', label ='Save')
-                    plt.scatter(punch['y'], punch['x'], s = 100, c = '#ffec00', marker = 'o', edgecolor = '#000000', label = 'Punch')
-                    plt.scatter(pickup['y'], pickup['x'], s = 120, c = '#dd571c', marker = '+', edgecolor = '#000000', label = 'Pick-Up')
-                    plt.scatter(tackle['y'], tackle['x'], s= 130,c = '#bebebe', marker = 'H', edgecolor = '#000000', label = 'Tackle')
-                    plt.scatter(recovery['y'], recovery['x'], s= 130, c = '#fcd200', marker = 'H', edgecolor = '#000000', label = 'Ball Recovery')
-                    plt.scatter(interception['y'], interception['x'], s = 130, c = '#ff007f', marker = 'H', edgecolor = '#000000', label = 'Interception')
-                    plt.scatter(clearance['y'], clearance['x'], s = 100, c = '#9999ff', marker = 'x', edgecolor = '#000000', label = 'Clearance')
-                    plt.scatter(shield['y'], shield['x'], s = 50, c = '#dd571c', marker = 'D', edgecolor = '#000000', label = 'Shielding Ball Out')
-                    plt.scatter(foul_won['y'], foul_won['x'], s= 120, c = '#008000', marker = 'X', edgecolor = '#000000', label = 'Foul Won')
-                    plt.scatter(foul_committed['y'], foul_committed['x'], s= 120, c = '#c21919', marker = 'X', edgecolor = '#000000', label = 'Foul Committed')
-                    plt.scatter(dispossessed['y'], dispossessed['x'], s = 100, c = '#cb0000', marker = 'p', edgecolor = '#000000', label = 'Dispossessed')
-                    plt.scatter(dribbled_past['y'], dribbled_past['x'], s = 50, c = '#cb0000', marker = 'x', edgecolor = '#000000', label = 'Dribbled Past')
-                    plt.scatter(own_goal['x'], own_goal['y'], s=120, c='red', edgecolor='orange', label='Own Goal')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(-0.13, 1.09), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-                        
-                    if selected_player or selected_team:
-                        st.pyplot(fig)
-
-                else:
-                    de = pitch.kdeplot(passes.x, passes.y, ax=ax, shade=True, shade_lowest=False, alpha=0.4, n_levels=10, cmap='magma')
-                    plt.scatter(tackle['y'], tackle['x'], s= 130,c = '#bebebe', marker = 'H', edgecolor = '#000000', label = 'Tackle')
-                    plt.scatter(recovery['y'], recovery['x'], s= 130, c = '#fcd200', marker = 'H', edgecolor = '#000000', label = 'Ball Recovery')
-                    plt.scatter(block['y'], block['x'], s = 130, c = 'cyan', marker = 'H', edgecolor = '#000000', label ='Block') #009afd
-                    plt.scatter(interception['y'], interception['x'], s = 130, c = '#ff007f', marker = 'H', edgecolor = '#000000', label = 'Interception')
-                    plt.scatter(clearance['y'], clearance['x'], s = 100, c = '#9999ff', marker = 'x', edgecolor = '#000000', label = 'Clearance')
-                    plt.scatter(offside['y'], offside['x'], s= 120, c = '#fcd200', marker = 'P', edgecolor = '#000000', label = 'Offside Provoked')
-                    plt.scatter(shield['y'], shield['x'], s = 50, c = '#dd571c', marker = 'D', edgecolor = '#000000', label = 'Shielding Ball Out')
-                    plt.scatter(foul_won['y'], foul_won['x'], s= 120, c = '#008000', marker = 'X', edgecolor = '#000000', label = 'Foul Won')
-                    plt.scatter(foul_committed['y'], foul_committed['x'], s= 120, c = '#c21919', marker = 'X', edgecolor = '#000000', label = 'Foul Committed')
-                    plt.scatter(aerial_won['y'], aerial_won['x'], s = 100, c = '#008000', marker = '^', edgecolor = '#000000', label = 'Aerial Won')
-                    plt.scatter(aerial_lost['y'], aerial_lost['x'], s = 100, c = '#c21919', marker = '^', edgecolor = '#000000', label = 'Aerial Lost')
-                    plt.scatter(dispossessed['y'], dispossessed['x'], s = 100, c = '#cb0000', marker = 'p', edgecolor = '#000000', label = 'Dispossessed')
-                    plt.scatter(dribbled_past['y'], dribbled_past['x'], s = 50, c = '#cb0000', marker = 'x', edgecolor = '#000000', label = 'Dribbled Past')
-                    plt.scatter(own_goal['x'], own_goal['y'], s=120, c='red', edgecolor='orange', label='Own Goal')
-
-                    ax.legend(loc='upper left', bbox_to_anchor=(-0.17, 1.12), facecolor = 'black', labelcolor = 'white', prop = {'size': 10}, framealpha=0.5, ncol=4, edgecolor='#ffffff')
-
-                    endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                    plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-
-                    if selected_player or selected_team:
-                        st.pyplot(fig)
-
-            if action_filter == "CONVEX HULL":
-                    # Filter data and scatter plot
-                filtered = filtered_data[~filtered_data['typeId'].isin([2, 17, 18, 19, 43])]
-                pitch.scatter(filtered.x, filtered.y, color='#00FF00', s=80, edgecolors='#FFFFFF', linewidth=1, ax=ax)
-
-                pitch.scatter(filtered.x, filtered.y, color='#00FF00', s=80, edgecolors='#FFFFFF', linewidth=1, ax=ax)
-
-                    # Creating an array of (x, y) coordinates for convex hull calculation
-                points = np.column_stack((filtered.x, filtered.y))
-
-                    # Calculate the convex hull of the data points
-                hull1 = pitch.convexhull(filtered.x, filtered.y)
-                hull = ConvexHull(points)
-
-                    # Plot the edges of the convex hull
-                for simplex in hull.simplices:
-                    pitch.plot(filtered.x.iloc[simplex], filtered.y.iloc[simplex], color='#00FFFF', linewidth=3, linestyle='dashed', ax=ax)
-
-                    # Create a polygon from the convex hull with a semi-transparent fill
-                polygon = pitch.polygon(hull1, color='#00FFFF', alpha=0.2, ax=ax)
-
-                endnote = "Made by Rishav. Data Source: OPTA. Built Using: Python and Streamlit."
-                plt.figtext(0.515, 0.115, endnote, ha="center", va="top", fontsize=13, color="white")
-
-                if selected_player or selected_team:
-                    st.pyplot(fig)
+            action_filter = select_view(team_views=True)
+
+            if render_mode == "Interactive" and action_filter in INTERACTIVE_VIEWS and selected_player:
+                show_figure(get_view_figure(match_file_path, selected_player, action_filter))
+            # Rendered views are cached as image bytes, so repeat views skip matplotlib
+            elif action_filter in VIEWS and selected_player:
+                show_rendered(get_view_image, match_file_path, selected_player, action_filter)
+            # Team views cover every Barcelona player of the match, whoever is selected
+            elif action_filter in TEAM_VIEWS:
+                show_rendered(get_team_view_image, match_file_path, action_filter)
 
     else:
         st.error(f"File {selected_match}.csv not found.")
 else:
     st.warning("No match files found in the 'Matches' folder.")
+
+show_diagnostics()
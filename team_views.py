@@ -0,0 +1,57 @@
+"""Team-level data for the match views: average positions and the pass network.
+
+Everything is computed over the whole Barcelona frame of a match with
+vectorized sort/shift/groupby, with no loop over players.
+"""
+import pandas as pd
+
+from event_categories import NON_PITCH_TYPES, TOUCH_TYPES
+from profiling import stage
+
+# Passes between two players below this count are left out of the network
+MIN_NETWORK_PASSES = 3
+
+
+def match_order(df):
+    """Events in the order they happened; the store keeps them sorted by player."""
+    return df.sort_values(["periodId", "timeMin", "timeSec", "eventId", "id"], kind="stable")
+
+
+def player_positions(df):
+    """Average location and number of on-ball events of each player, indexed by playerName."""
+    events = df[~df["typeId"].isin(NON_PITCH_TYPES) & df["playerName"].notna()]
+    return events.groupby(events["playerName"].astype(str)).agg(x=("x", "mean"), y=("y", "mean"), touches=("x", "size"))
+
+
+def pass_pairs(df):
+    """Completed passes counted per (passer, receiver).
+
+    The receiver of a completed pass is the player of Barcelona's next touch
+    of the ball in the same period, when that is another player. Events off
+    the ball, such as fouls, cards or the ball going out, are skipped.
+    """
+    ordered = match_order(df)
+    touches = ordered[ordered["typeId"].isin(TOUCH_TYPES) & ordered["playerName"].notna()]
+    passer = touches["playerName"].astype(object)
+    receiver = passer.groupby(touches["periodId"]).shift(-1)
+    completed = (touches["typeId"] == 1) & (touches["outcome"] == 1) & receiver.notna() & (passer != receiver)
+    pairs = pd.DataFrame({"passer": passer[completed], "receiver": receiver[completed]})
+    return pairs.groupby(["passer", "receiver"]).size().rename("passes").reset_index()
+
+
+def pass_network(df, min_passes=MIN_NETWORK_PASSES):
+    """(nodes, edges) of a match's pass network.
+
+    nodes are player_positions; edges hold passer, receiver, passes and the
+    average positions of both ends, for pairs with at least min_passes passes.
+    """
+    with stage("pass network") as counters:
+        nodes = player_positions(df)
+        edges = pass_pairs(df)
+        edges = edges[edges["passes"] >= min_passes]
+        ends = nodes[["x", "y"]]
+        edges = (edges.join(ends, on="passer")
+                 .join(ends.rename(columns={"x": "end_x", "y": "end_y"}), on="receiver")
+                 .reset_index(drop=True))
+        counters["rows"] = len(df)
+    return nodes, edges
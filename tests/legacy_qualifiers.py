@@ -0,0 +1,26 @@
+"""The row-wise qualifier decoding the app used before match_data.decode_qualifiers.
+
+Kept as the reference the vectorized decoder is checked against, by
+tests/test_match_data.py and benchmarks/bench_qualifiers.py.
+"""
+import numpy as np
+
+
+def legacy_end_xy(df):
+    # The loop the app used before decode_qualifiers
+    df = df.copy()
+    qualifier_id_cols = [col for col in df.columns if "/qualifierId" in col]
+    qualifier_value_cols = [col.replace("/qualifierId", "/value") for col in qualifier_id_cols]
+
+    df['end_x'] = np.nan
+    df['end_y'] = np.nan
+
+    for id_col, value_col in zip(qualifier_id_cols, qualifier_value_cols):
+        df['end_x'] = df.apply(lambda row: row[value_col] if row[id_col] == 140 else row['end_x'], axis=1)
+        df['end_y'] = df.apply(lambda row: row[value_col] if row[id_col] == 141 else row['end_y'], axis=1)
+    return df[['end_x', 'end_y']].astype(float)
+
+
+def legacy_own_goal(df):
+    qualifier_columns = [col for col in df.columns if col.startswith('qualifier/') and col.endswith('/value')]
+    return df[qualifier_columns].apply(lambda row: 'OWN_GOAL' in row.values, axis=1)
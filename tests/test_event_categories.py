@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+
+from event_categories import INCOMPLETE_PASS_CATEGORIES, KEY_PASS_CATEGORIES, PASS_CATEGORIES, split_events
+from match_data import load_match, sort_by_player
+from match_store import runs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH = os.path.join(ROOT, "Matches", "UEFA Champions League", "MD7 - Benfica 4-5 Barcelona.csv")
+
+
+def player_runs(events):
+    type_ids = events["typeId"].to_numpy()
+    bounds = runs(type_ids)
+    return type_ids[bounds[:-1]], bounds[:-1]
+
+
+def test_type_runs_give_the_same_groups():
+    df = sort_by_player(load_match(MATCH))
+    for player_name in df["playerName"].dropna().unique():
+        events = df[df["playerName"] == player_name]
+        expected = split_events(events)
+        groups = split_events(events, player_runs(events))
+        assert groups.keys() == expected.keys()
+        for name in expected:
+            pd.testing.assert_frame_equal(groups[name], expected[name])
+
+
+def test_type_runs_of_other_rows_are_ignored():
+    df = sort_by_player(load_match(MATCH))
+    events = df[df["playerName"] == "Pedri"]
+    stale = player_runs(events.iloc[1:])
+    expected = split_events(events)
+    groups = split_events(events, stale)
+    for name in expected:
+        pd.testing.assert_frame_equal(groups[name], expected[name])
+
+
+def flagged_events(rows):
+    """Events of (typeId, outcome, assist, keyPass) rows."""
+    frame = pd.DataFrame(rows, columns=["typeId", "outcome", "assist", "keyPass"])
+    frame["own_goal"] = False
+    return frame
+
+
+def test_failed_key_pass_is_an_incomplete_pass():
+    groups = split_events(flagged_events([(1, 1, 0, 1), (1, 0, 0, 1)]))
+    assert len(groups["key_pass"]) == 1
+    assert len(groups["key_pass_incomplete"]) == 1
+    assert "key_pass_incomplete" in KEY_PASS_CATEGORIES
+    assert "key_pass_incomplete" in INCOMPLETE_PASS_CATEGORIES
+    assert "key_pass_incomplete" in PASS_CATEGORIES
+
+
+def test_flags_on_other_events_keep_their_category():
+    # A clearance marked as a key pass, and a missed shot marked as an assist
+    groups = split_events(flagged_events([(12, 1, 0, 1), (13, 1, 1, 0)]))
+    assert len(groups["clearance"]) == 1
+    assert len(groups["shot_miss"]) == 1
+    for name in ("assist", "assist_incomplete", "key_pass", "key_pass_incomplete"):
+        assert groups[name].empty
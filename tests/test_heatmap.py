@@ -0,0 +1,66 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from mplsoccer import VerticalPitch  # noqa: E402
+
+from heatmap import HEATMAP_MIN_PASSES, N_LEVELS, THRESHOLD, density_levels, draw_heatmap, pass_density  # noqa: E402
+
+
+def passes_around(x, y, count, seed=0):
+    rng = np.random.default_rng(seed)
+    return x + rng.normal(0, 4, count), y + rng.normal(0, 4, count)
+
+
+def test_density_is_indexed_by_x_then_y_and_sums_to_one():
+    x, y = passes_around(80, 20, 40)
+    density, centers = pass_density(x, y)
+    assert np.isclose(density.sum(), 1)
+    peak_x, peak_y = np.unravel_index(density.argmax(), density.shape)
+    assert abs(centers[peak_x] - 80) < 5
+    assert abs(centers[peak_y] - 20) < 5
+
+
+def test_no_passes_give_an_empty_density():
+    density, centers = pass_density([], [])
+    assert density.shape == (len(centers), len(centers))
+    assert not density.any()
+
+
+def test_levels_leave_the_lowest_mass_unshaded():
+    density, _ = pass_density(*passes_around(50, 50, 60))
+    levels = density_levels(density)
+    assert 2 <= len(levels) <= N_LEVELS
+    assert (np.diff(levels) > 0).all()
+    assert np.isclose(density[density >= levels[0]].sum(), 1 - THRESHOLD, atol=0.01)
+
+
+def test_heatmap_is_drawn_where_the_passes_are_on_the_pitch():
+    pitch = VerticalPitch(pitch_type="opta")
+    fig, ax = pitch.draw()
+    contours = draw_heatmap(*passes_around(80, 20, 40), pitch, ax, mode="binned")
+    # The pitch is vertical: Opta x runs up the plot, Opta y along it
+    vertices = np.concatenate([path.vertices for path in contours.get_paths() if len(path.vertices)])
+    plt.close(fig)
+    assert abs(np.median(vertices[:, 0]) - 20) < 10
+    assert abs(np.median(vertices[:, 1]) - 80) < 10
+
+
+class RecordingPitch:
+    def __init__(self):
+        self.kde_calls = 0
+
+    def kdeplot(self, x, y, **kwargs):
+        self.kde_calls += 1
+
+
+def test_few_passes_fall_back_to_the_kde():
+    pitch = RecordingPitch()
+    fig, ax = VerticalPitch(pitch_type="opta").draw()
+    draw_heatmap(*passes_around(50, 50, HEATMAP_MIN_PASSES - 1), pitch, ax, mode="binned")
+    assert pitch.kde_calls == 1
+    assert draw_heatmap(*passes_around(50, 50, HEATMAP_MIN_PASSES), pitch, ax, mode="binned") is not None
+    assert pitch.kde_calls == 1
+    plt.close(fig)
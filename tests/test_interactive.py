@@ -0,0 +1,33 @@
+import os
+
+from interactive import INTERACTIVE_VIEWS, interactive_figure, open_view
+from match_store import read_match
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH = os.path.join(ROOT, "Matches", "La Liga", "MD35 - Barcelona 4-3 Real Madrid.csv")
+
+
+def player_events(player_name):
+    df = read_match(MATCH)
+    return df[df["playerName"] == player_name]
+
+
+def test_figure_holds_the_layers_of_every_view():
+    figure = interactive_figure(player_events("Pedri"), "Pedri")
+    buttons = figure["layout"]["updatemenus"][0]["buttons"]
+    assert [button["label"] for button in buttons] == [view.title() for view in INTERACTIVE_VIEWS]
+    for button in buttons:
+        visible = button["args"][0]["visible"]
+        assert len(visible) == len(figure["data"])
+        assert any(visible)
+    # Each view shows layers the others hide, so all three are in the one figure
+    shown = [{trace["name"] for trace, on in zip(figure["data"], button["args"][0]["visible"]) if on} for button in buttons]
+    assert shown[0] != shown[1] and shown[1] != shown[2] and shown[0] != shown[2]
+
+
+def test_opening_a_view_matches_building_the_figure_on_it():
+    events = player_events("Pedri")
+    figure = interactive_figure(events, "Pedri")
+    for view in INTERACTIVE_VIEWS:
+        assert open_view(figure, view) == interactive_figure(events, "Pedri", view)
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.legacy_qualifiers import legacy_end_xy, legacy_own_goal
+from match_data import decode_qualifiers, load_match
+from profiling import finish_run, start_run
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH = os.path.join(ROOT, "Matches", "UEFA Champions League", "MD7 - Benfica 4-5 Barcelona.csv")
+UNDATED = os.path.join(ROOT, "Matches", "La Liga", "MD24 - Barcelona 1-0 Rayo Vallecano.csv")
+
+
+def qualifier_frame():
+    """Five events over three qualifier slots, values stored as the CSVs do."""
+    return pd.DataFrame({
+        "qualifier/0/qualifierId": [140, 140, 28, np.nan, 141],
+        "qualifier/0/value": ["52.3", "10.0", "OWN_GOAL", np.nan, "7.5"],
+        "qualifier/1/qualifierId": [141, 212, 140, np.nan, 141],
+        "qualifier/1/value": ["41.9", "18.1", "95.0", np.nan, "8.5"],
+        # The second row repeats 140, so its right-most slot gives end_x
+        "qualifier/2/qualifierId": [56, 140, 141, np.nan, 56],
+        "qualifier/2/value": ["Back", "60.4", "47.7", np.nan, "Center"],
+    }, index=[3, 7, 8, 12, 20])
+
+
+def test_decoder_matches_the_row_wise_loop():
+    df = qualifier_frame()
+    decoded = decode_qualifiers(df)
+    pd.testing.assert_frame_equal(decoded[["end_x", "end_y"]], legacy_end_xy(df))
+    pd.testing.assert_series_equal(decoded["own_goal"], legacy_own_goal(df).astype(bool), check_names=False)
+    assert decoded.loc[7, "end_x"] == 60.4
+    assert decoded.loc[20, "end_y"] == 8.5
+    assert decoded["own_goal"].tolist() == [False, False, True, False, False]
+    assert np.isnan(decoded.loc[12, ["end_x", "end_y"]].astype(float)).all()
+
+
+@pytest.mark.parametrize("path", [MATCH, UNDATED])
+def test_chunked_read_matches_a_single_read(path):
+    expected = load_match(path)
+    # Small chunks split the match across many reads
+    pd.testing.assert_frame_equal(load_match(path, chunksize=97), expected)
+
+
+def test_ingest_steps_are_timed_over_every_chunk():
+    start_run()
+    df = load_match(MATCH, chunksize=500)
+    stages = {row["stage"]: row for row in finish_run("load")["stages"]}
+    assert [name for name in stages] == ["csv parse", "team filter", "qualifier decode", "compact columns"]
+    assert stages["team filter"]["rows"] == stages["qualifier decode"]["rows"] == len(df)
+    assert stages["csv parse"]["rows"] > len(df)
@@ -0,0 +1,75 @@
+import os
+import shutil
+
+import pandas as pd
+
+from match_store import PlayerIndex, build_index, build_store, match_key, read_match, same_stamp, store_path, store_stamp
+from match_watcher import MatchWatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH = os.path.join(ROOT, "Matches", "La Liga", "MD35 - Barcelona 4-3 Real Madrid.csv")
+
+
+def test_index_rows_apply_to_a_frame_read_before_the_next_scan(tmp_path):
+    matches_folder, store_folder = str(tmp_path / "Matches"), str(tmp_path / "store")
+    os.makedirs(os.path.join(matches_folder, "La Liga"))
+    path = shutil.copy(MATCH, os.path.join(matches_folder, "La Liga"))
+    build_store(matches_folder, store_folder)
+    build_index(matches_folder, store_folder)
+    watcher = MatchWatcher(matches_folder, store_folder, interval=0)
+    watcher.poll()
+
+    # The CSV changes and a session reads it before the watcher converts it
+    os.utime(path)
+    df = read_match(path, matches_folder, store_folder)
+    watcher.poll()
+    index = PlayerIndex.load(matches_folder, store_folder)
+
+    assert index.covers(path)
+    pd.testing.assert_frame_equal(df, read_match(path, matches_folder, store_folder))
+    for player_name in df["playerName"].dropna().unique():
+        events = df.iloc[index.player_rows(path, player_name)]
+        assert (events["playerName"] == player_name).all()
+        assert len(events) == (df["playerName"] == player_name).sum()
+
+
+def test_type_runs_address_each_type_within_the_player_rows(tmp_path):
+    matches_folder, store_folder = str(tmp_path / "Matches"), str(tmp_path / "store")
+    os.makedirs(os.path.join(matches_folder, "La Liga"))
+    path = shutil.copy(MATCH, os.path.join(matches_folder, "La Liga"))
+    build_store(matches_folder, store_folder)
+    build_index(matches_folder, store_folder)
+    index = PlayerIndex.load(matches_folder, store_folder)
+    df = read_match(path, matches_folder, store_folder)
+
+    for player_name in index.players(path):
+        type_ids = df.iloc[index.player_rows(path, player_name)]["typeId"].to_numpy()
+        run_types, starts = index.type_runs(path, player_name)
+        stops = list(starts[1:]) + [len(type_ids)]
+        assert list(run_types) == sorted(set(type_ids))
+        for type_id, start, stop in zip(run_types, starts, stops):
+            assert (type_ids[start:stop] == type_id).all()
+    assert index.type_runs(path, "Nobody") is None
+
+
+def test_index_covers_a_store_file_whose_mtime_lost_its_fraction(tmp_path):
+    matches_folder, store_folder = str(tmp_path / "Matches"), str(tmp_path / "store")
+    os.makedirs(os.path.join(matches_folder, "La Liga"))
+    path = shutil.copy(MATCH, os.path.join(matches_folder, "La Liga"))
+    os.utime(path, (1_700_000_000, 1_700_000_000))
+    build_store(matches_folder, store_folder)
+    converted_path = store_path(path, matches_folder, store_folder)
+    os.utime(converted_path, ns=(1_700_000_100_400_000_000, 1_700_000_100_400_000_000))
+    build_index(matches_folder, store_folder)
+    index = PlayerIndex.load(matches_folder, store_folder)
+    assert index.covers(path)
+
+    # Copied or restored without sub-second mtimes, as a checkpoint or archive may
+    os.utime(converted_path, (1_700_000_100, 1_700_000_100))
+    index = PlayerIndex.load(matches_folder, store_folder)
+    assert index.covers(path)
+    assert index.match_entries(match_key(path, matches_folder), store_stamp(converted_path)) is not None
+
+    # The same mtime with another size is another file
+    assert not same_stamp(store_stamp(converted_path), (1_700_000_100.0, store_stamp(converted_path)[1] + 1))
@@ -0,0 +1,76 @@
+import os
+import shutil
+import threading
+
+import match_watcher
+from match_store import build_store
+from match_watcher import MatchWatcher, scan_matches
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UNDATED = os.path.join(ROOT, "Matches", "La Liga", "MD24 - Barcelona 1-0 Rayo Vallecano.csv")
+DATED = os.path.join(ROOT, "Matches", "La Liga", "MD35 - Barcelona 4-3 Real Madrid.csv")
+
+
+def test_unreadable_csv_is_skipped(tmp_path):
+    competition = tmp_path / "Matches" / "La Liga"
+    competition.mkdir(parents=True)
+    for path in (UNDATED, DATED):
+        shutil.copy(path, competition)
+    bad = competition / "MD99 - Bad.csv"
+    bad.write_text('garbage\n"unclosed\n')
+    watcher = MatchWatcher(str(tmp_path / "Matches"), str(tmp_path / "store"), interval=0)
+
+    watcher.poll()
+    assert list(watcher.errors) == [str(bad)]
+    # Dated matches first, then the match without a timeStamp column
+    assert [entry["match"] for entry in watcher.match_catalog()] == ["MD35 - Barcelona 4-3 Real Madrid", "MD24 - Barcelona 1-0 Rayo Vallecano"]
+
+    shutil.copy(DATED, bad)
+    watcher.poll()
+    assert watcher.errors == {}
+    assert len(watcher.match_catalog()) == 3
+
+
+def test_sessions_wait_for_the_first_scan(tmp_path, monkeypatch):
+    competition = tmp_path / "Matches" / "La Liga"
+    competition.mkdir(parents=True)
+    shutil.copy(DATED, competition)
+    watcher = MatchWatcher(str(tmp_path / "Matches"), str(tmp_path / "store"), interval=60)
+
+    scanning, release = threading.Event(), threading.Event()
+
+    def slow_scan(matches_folder):
+        scanning.set()
+        release.wait(5)
+        return scan_matches(matches_folder)
+
+    monkeypatch.setattr(match_watcher, "scan_matches", slow_scan)
+    first = threading.Thread(target=watcher.poll)
+    first.start()
+    scanning.wait(5)
+
+    # A second session arriving mid-scan waits for the catalog instead of returning without one
+    catalogs = []
+    second = threading.Thread(target=lambda: (watcher.poll(), catalogs.append(watcher.match_catalog())))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()
+    release.set()
+    first.join()
+    second.join()
+    assert [entry["match"] for entry in catalogs[0]] == ["MD35 - Barcelona 4-3 Real Madrid"]
+
+
+def test_catalog_read_before_the_first_scan_is_not_kept(tmp_path):
+    matches_folder, store_folder = str(tmp_path / "Matches"), str(tmp_path / "store")
+    competition = tmp_path / "Matches" / "La Liga"
+    competition.mkdir(parents=True)
+    shutil.copy(DATED, competition)
+    # With an up to date store, the first scan finds nothing to convert
+    build_store(matches_folder, store_folder)
+    watcher = MatchWatcher(matches_folder, store_folder, interval=0)
+
+    assert watcher.competition_catalog() == {}
+    assert watcher.poll() is None
+    assert watcher.competition_catalog() == {"La Liga": ["MD35 - Barcelona 4-3 Real Madrid"]}
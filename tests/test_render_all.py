@@ -0,0 +1,34 @@
+import os
+import shutil
+
+from render_all import prerendered_image, stale_jobs, write_manifest
+from views import RENDER_SETTINGS, VIEWS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH = os.path.join(ROOT, "Matches", "La Liga", "MD35 - Barcelona 4-3 Real Madrid.csv")
+
+
+def test_images_of_other_render_settings_are_stale(tmp_path):
+    matches_folder, output_folder = str(tmp_path / "Matches"), str(tmp_path / "rendered")
+    os.makedirs(os.path.join(matches_folder, "La Liga"))
+    os.makedirs(output_folder)
+    path = shutil.copy(MATCH, os.path.join(matches_folder, "La Liga"))
+    with open(os.path.join(output_folder, "pedri.png"), "wb") as f:
+        f.write(b"image")
+
+    for number, settings in enumerate([RENDER_SETTINGS, "other"]):
+        entry = {"match": "La Liga/" + os.path.basename(MATCH), "player": "Pedri", "view": VIEWS[0], "format": "png",
+                 "source_mtime": os.path.getmtime(path), "render_settings": settings, "file": "pedri.png"}
+        write_manifest({"pedri": entry}, output_folder)
+        # The app rereads the manifest when its mtime changes
+        os.utime(os.path.join(output_folder, "manifest.json"), (number, number))
+        manifest = {(entry["match"], entry["player"], entry["view"], entry["format"]): entry}
+        jobs = stale_jobs(path, manifest, output_folder, "png", matches_folder, str(tmp_path / "store"))
+        image = prerendered_image(path, "Pedri", VIEWS[0], "png", matches_folder, output_folder)
+        if settings == RENDER_SETTINGS:
+            assert image == b"image"
+            assert ("Pedri", VIEWS[0]) not in jobs
+        else:
+            assert image is None
+            assert ("Pedri", VIEWS[0]) in jobs
@@ -0,0 +1,38 @@
+import pytest
+
+# render_cache draws through Streamlit's caches, which the app's host provides
+pytest.importorskip("streamlit")
+
+from render_cache import ByteLRUCache  # noqa: E402
+
+
+def test_least_recently_used_images_are_evicted_first():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+    # "b" was used least recently, so it makes room for "c"
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.stats()["bytes"] == 8
+
+    cache.put("a", b"aaaaaa")
+    assert cache.stats()["bytes"] == 10
+    cache.put("d", b"d")
+    assert cache.get("c") is None
+    assert cache.stats() == {"cache": "render", "entries": 2, "bytes": 7, "hits": 3, "misses": 2}
+
+
+def test_an_image_larger_than_the_budget_is_not_kept():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("big", b"x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("a") == b"aaaa"
+
+    # Replacing an entry with an oversized image drops the old one too
+    cache.put("a", b"y" * 11)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
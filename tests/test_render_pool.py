@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+
+import pytest
+
+from match_store import read_match
+from profiling import finish_run, start_run
+from render_pool import RenderPool
+from views import render_image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH = os.path.join(ROOT, "Matches", "La Liga", "MD35 - Barcelona 4-3 Real Madrid.csv")
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_worker_stages_reach_the_run(kind):
+    df = read_match(MATCH)
+    player_name = "Pedri"
+    pool = RenderPool(workers=1, queue=1, kind=kind)
+    start_run()
+    data = pool.render((MATCH, player_name, "CONVEX HULL"), render_image, df[df["playerName"] == player_name], player_name, "CONVEX HULL", "png")
+    run = finish_run("CONVEX HULL")
+    assert data.startswith(b"\x89PNG")
+    names = [row["stage"] for row in run["stages"]]
+    # Drawing stages recorded on the worker come before the pool stage that waited for them
+    assert {"pitch", "draw and encode"} <= set(names[:-1])
+    assert names[-1] == "render pool"
+
+
+def test_same_key_is_rendered_once():
+    release = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        release.wait(5)
+        return value
+
+    pool = RenderPool(workers=2, queue=8, kind="thread")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.render("key", slow, 1))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while pool.stats()["submitted"] + pool.stats()["shared"] < len(threads):
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == [1] * len(threads)
+    assert pool.stats()["submitted"] == 1
@@ -0,0 +1,32 @@
+import csv
+import datetime
+import glob
+import os
+
+import pytest
+
+from match_store import MATCHES_FOLDER
+from season import catalog_entry, match_date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATCH_FILES = sorted(glob.glob(os.path.join(ROOT, MATCHES_FOLDER, "*", "*.csv")))
+
+
+def header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+
+def test_matches_found():
+    assert MATCH_FILES
+
+
+@pytest.mark.parametrize("path", MATCH_FILES, ids=lambda path: os.path.relpath(path, os.path.join(ROOT, MATCHES_FOLDER)))
+def test_match_date(path):
+    date = match_date(path)
+    if "timeStamp" in header(path):
+        assert isinstance(date, datetime.date)
+    else:
+        assert date is None
+    assert catalog_entry(path)["date"] == date
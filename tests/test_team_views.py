@@ -0,0 +1,40 @@
+import pandas as pd
+
+from team_views import MIN_NETWORK_PASSES, pass_network, pass_pairs
+
+
+def events(rows):
+    """Events of (periodId, typeId, outcome, playerName) rows, in match order."""
+    frame = pd.DataFrame(rows, columns=["periodId", "typeId", "outcome", "playerName"])
+    frame["timeMin"] = frame["timeSec"] = 0
+    frame["eventId"] = frame["id"] = range(len(frame))
+    frame["x"] = frame["y"] = 50.0
+    return frame
+
+
+def pair_counts(df):
+    return {(row.passer, row.receiver): row.passes for row in pass_pairs(df).itertuples()}
+
+
+def test_receiver_is_the_next_touch_in_the_same_period():
+    df = events([
+        (1, 1, 1, "Pedri"),
+        (1, 4, 1, "Gavi"),  # a foul, off the ball
+        (1, 61, 1, "Raphinha"),
+        (1, 1, 1, "Raphinha"),  # the period ends before anyone receives it
+        (2, 1, 1, "Pedri"),
+        (2, 1, 0, "Gavi"),
+        (2, 3, 1, "Pedri"),
+    ])
+    assert pair_counts(df) == {("Pedri", "Raphinha"): 1, ("Pedri", "Gavi"): 1}
+
+
+def test_network_keeps_pairs_with_enough_passes():
+    rows = []
+    for _ in range(MIN_NETWORK_PASSES):
+        rows += [(1, 1, 1, "Pedri"), (1, 61, 1, "Lamine Yamal")]
+    rows += [(1, 1, 1, "Pedri"), (1, 61, 1, "Gavi")]
+    nodes, edges = pass_network(events(rows))
+    assert set(nodes.index) == {"Pedri", "Lamine Yamal", "Gavi"}
+    assert edges[["passer", "receiver", "passes"]].values.tolist() == [["Pedri", "Lamine Yamal", MIN_NETWORK_PASSES]]
+    assert list(edges.columns) == ["passer", "receiver", "passes", "x", "y", "end_x", "end_y"]
@@ -0,0 +1,83 @@
+"""The views the app offers, and the entry points that draw and encode them.
+
+Matplotlib, mplsoccer and scipy are only imported by the drawing module,
+which render_view loads on its first call, so importing this module (for
+VIEWS, say) stays cheap at startup.
+"""
+import hashlib
+import io
+import json
+
+from heatmap import HEATMAP_BINS, HEATMAP_MIN_PASSES, HEATMAP_MODE, HEATMAP_SIGMA
+from profiling import stage
+from startup import mark
+
+# Views offered by the action bar, in button order
+VIEWS = ["ALL ACTIONS IN THE MATCH", "PASSES AND HEATMAP", "OFFENSIVE ACTIONS", "DEFENSIVE ACTIONS", "CONVEX HULL"]
+
+# Views of the whole team in a match, drawn from every Barcelona event
+TEAM_VIEWS = ["PASS NETWORK", "TEAM SHAPE"]
+
+# Same options st.pyplot uses, so encoded images match what it displayed
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+# Bump when a change to drawing, event categories or heatmaps changes what an image shows
+RENDER_VERSION = 1
+
+
+def render_settings():
+    """Short hash of everything besides the events that decides how an image looks."""
+    settings = {
+        "version": RENDER_VERSION,
+        "heatmap": [HEATMAP_MODE, HEATMAP_MIN_PASSES, HEATMAP_BINS, HEATMAP_SIGMA],
+        "savefig": SAVEFIG_OPTIONS,
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+
+# Settings of the images this process renders, recorded with pre-rendered images
+RENDER_SETTINGS = render_settings()
+
+
+def render_view(filtered_data, selected_player, view, type_runs=None):
+    """Draw one view of a player's events on a fresh pitch and return the figure."""
+    from drawing import draw_view
+
+    mark("plotting libraries imported")
+    fig = draw_view(filtered_data, selected_player, view, type_runs)
+    mark("first view drawn")
+    return fig
+
+
+def render_team_view(team_data, network, view):
+    """Draw one team view of a match on a fresh pitch and return the figure."""
+    from drawing import draw_team_view
+
+    mark("plotting libraries imported")
+    return draw_team_view(team_data, network, view)
+
+
+def render_image(filtered_data, selected_player, view, fmt="png", type_runs=None):
+    """Encoded image of one view of a player's events; a render pool task."""
+    return encode_figure(render_view(filtered_data, selected_player, view, type_runs), fmt)
+
+
+def render_team_image(team_data, network, view, fmt="png"):
+    """Encoded image of one team view of a match; a render pool task."""
+    return encode_figure(render_team_view(team_data, network, view), fmt)
+
+
+def encode_figure(fig, fmt="png"):
+    """Encode a figure to image bytes and clear it."""
+    buffer = io.BytesIO()
+    # savefig is where matplotlib actually draws the artists
+    with stage("draw and encode") as counters:
+        counters["artists"] = sum(len(ax.get_children()) for ax in fig.axes)
+        try:
+            fig.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+        finally:
+            # Drop the artists now rather than when the figure is collected
+            fig.clear()
+        counters["bytes"] = buffer.tell()
+    mark("first view encoded")
+    return buffer.getvalue()